@@ -1,4 +1,4 @@
-from app.api.routes import auth, books, data, users, wishlist
+from app.api.routes import auth, books, data, events, users, wishlist
 
 
-__all__ = ['auth', 'books', 'data', 'users', 'wishlist']
+__all__ = ['auth', 'books', 'data', 'events', 'users', 'wishlist']
@@ -1,16 +1,15 @@
 from fastapi import APIRouter, HTTPException, Request, Response, status, Depends, Cookie
-from fastapi.concurrency import run_in_threadpool
 from bson import ObjectId
 from jose import JWTError
 from datetime import datetime, timezone, timedelta
 
 from app.core.database import db
-from app.core.dependencies import get_current_active_user
+from app.core.dependencies import get_current_active_user, invalidate_user_cache
 from app.core.email import send_verification_email, send_password_reset_email
 from app.schemas.auth import SignupRequest, LoginRequest, ResendVerificationRequest, ForgotPasswordRequest, ResetPasswordRequest
 from app.core.security import (
-    get_password_hash, 
-    verify_password, 
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_token
@@ -40,7 +39,7 @@ async def signup(data: SignupRequest):
             detail="User name already taken! Choose a different one."
         )
     
-    hashed_password = await run_in_threadpool(get_password_hash, data.password.get_secret_value())
+    hashed_password = await get_password_hash_async(data.password.get_secret_value())
     
     # Create user
     new_user = {
@@ -104,9 +103,8 @@ async def login(data: LoginRequest, response: Response):
             detail="User does not exist"
         )
 
-    password_is_correct = await run_in_threadpool(
-        verify_password, 
-        data.password.get_secret_value(), 
+    password_is_correct = await verify_password_async(
+        data.password.get_secret_value(),
         user["password"]
     )
 
@@ -133,6 +131,7 @@ async def login(data: LoginRequest, response: Response):
         {"_id": user["_id"]},
         {"$set": {"last_login": datetime.now(timezone.utc)}}
     )
+    invalidate_user_cache(user["_id"])
 
     # Create tokens
     access_token = create_access_token(data={"sub": str(user["_id"])})
@@ -246,6 +245,7 @@ async def verify_email(token: str):
             {"_id": ObjectId(user_id)},
             {"$set": {"is_verified": True, "updated_at": datetime.now(timezone.utc)}}
         )
+        invalidate_user_cache(user_id)
         
         if result.modified_count == 0:
             raise HTTPException(
@@ -343,7 +343,7 @@ async def reset_password(token: str, request: ResetPasswordRequest):
             )
         
         user_id = payload.get("sub")
-        hashed_password = await run_in_threadpool(get_password_hash, request.password)
+        hashed_password = await get_password_hash_async(request.password.get_secret_value())
         
         # Update password
         result = await db.users.update_one(
@@ -355,6 +355,7 @@ async def reset_password(token: str, request: ResetPasswordRequest):
                 }
             }
         )
+        invalidate_user_cache(user_id)
         
         if result.modified_count == 0:
             raise HTTPException(
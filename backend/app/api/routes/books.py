@@ -1,46 +1,128 @@
-from fastapi import APIRouter, UploadFile, HTTPException, status, File, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, UploadFile, HTTPException, status, File, Depends, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from bson import ObjectId
-from datetime import datetime, timezone
+from datetime import datetime, timezone, MAXYEAR
+from typing import Literal
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+import asyncio
 import math
 
+from app.core.changes import BOOK, fetch_changes, record_deletions
 from app.core.cloudinary import upload_book_cover, delete_cloudinary_image
+from app.core.counters import get_counters, increment_counters
 from app.core.database import db
+from app.core.facets import get_book_facets
+from app.core.mutations import as_stored, update_with_derived
+from app.core.loaders import book_loader
+from app.core.stats import get_user_stats, record_book_change, record_book_changes
 from app.core.dependencies import get_current_active_user
+from app.core.versions import (
+    BOOKS,
+    bump_library_version,
+    etag_matches,
+    get_library_version,
+    library_etag,
+    make_etag,
+    not_modified,
+    set_etag,
+)
 from app.schemas.book import (
     BookCreateRequest,
     BookUpdateRequest,
     BookResponse,
     BooksListResponse,
     BookStatsResponse,
+    BookBulkRequest,
+    BookBulkResponse,
+    BooksBatchResponse,
+    BookNeighborsResponse,
+    BookChangesResponse,
+    BookFacetsResponse,
+    BookSuggestResponse,
+)
+from app.utils.book_fields import (
+    DERIVED_SOURCE_FIELDS,
+    book_derived_fields,
+    derived_fields_for_update,
+    fold,
 )
+from app.utils.pagination import fetch_page, fetch_neighbors
+from app.utils.serializers import serialize_book
+from app.utils.validators import validate_date_range
+from app.utils.search import contains_filter, prefix_range, search_filter
 
 
 router = APIRouter(tags=["Books"])
 
 
-# Helper function to serialize book
-def serialize_book(book: dict) -> dict:
-    """Convert MongoDB document to BookResponse format"""
-    return {
-        "id": str(book["_id"]),
-        "title": book["title"],
-        "author": book.get("author"),
-        "isbn": book.get("isbn"),
-        "genre": book.get("genre"),
-        "rating": book.get("rating", 0.0),
-        "description": book.get("description"),
-        "cover_image": book.get("cover_image"),
-        "reading_started": book["reading_started"],
-        "reading_finished": book.get("reading_finished"),
-        "is_favorite": book.get("is_favorite", False),
-        "page_count": book.get("page_count"),
-        "publisher": book.get("publisher"),
-        "publication_year": book.get("publication_year"),
-        "language": book.get("language", "English"),
-        "format": book.get("format"),
-        "created_at": book["created_at"],
-        "updated_at": book["updated_at"],
-    }
+DUPLICATE_BOOK_DETAIL = "A book with the same title, author and language already exists"
+MAX_BATCH_IDS = 300
+
+# Bulk updates only apply while these still hold their planned values
+# (counter deltas and derived fields are computed from them)
+BULK_GUARD_FIELDS = ("is_favorite", *sorted(DERIVED_SOURCE_FIELDS))
+
+# Autocomplete fields: (case-folded field, display field) - each pair is covered by a
+# (user_id, <field>_lc, <field>) index, so suggestions never fetch documents
+SUGGEST_FIELDS = {
+    "title": ("title_lc", "title"),
+    "author": ("author_lc", "author"),
+    "genre": ("genre_lc", "genre"),
+}
+
+
+def _reading_started_range(
+    year: int | None,
+    month: int | None,
+    started_from: datetime | None,
+    started_to: datetime | None,
+) -> dict:
+    """
+    Half-open reading_started bounds for the year/month/date-range filters,
+    so the (user_id, reading_started) index serves them. Years/months are UTC.
+    """
+    if month is not None and year is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="month filter requires year"
+        )
+
+    started_from = _as_utc(started_from) if started_from else None
+    started_to = _as_utc(started_to) if started_to else None
+
+    if not validate_date_range(started_from, started_to):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="started_to must be after started_from"
+        )
+
+    bounds = {}
+
+    if year is not None:
+        if month is None:
+            bounds["$gte"] = datetime(year, 1, 1, tzinfo=timezone.utc)
+            bounds["$lt"] = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+        else:
+            bounds["$gte"] = datetime(year, month, 1, tzinfo=timezone.utc)
+            bounds["$lt"] = (
+                datetime(year, month + 1, 1, tzinfo=timezone.utc) if month < 12
+                else datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+            )
+
+    # Intersect with the explicit range (both may be given)
+    if started_from is not None:
+        bounds["$gte"] = max(bounds["$gte"], started_from) if "$gte" in bounds else started_from
+
+    if started_to is not None:
+        bounds["$lt"] = min(bounds["$lt"], started_to) if "$lt" in bounds else started_to
+
+    return bounds
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive query datetimes as UTC (how reading_started is stored)"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
 
 
 @router.post("/", response_model=BookResponse, status_code=status.HTTP_201_CREATED)
@@ -71,40 +153,188 @@ async def create_book(
         "created_at": datetime.now(timezone.utc),
         "updated_at": datetime.now(timezone.utc),
     }
+    new_book.update(book_derived_fields(new_book))
 
-    result = await db.books.insert_one(new_book)
+    try:
+        result = await db.books.insert_one(new_book)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=DUPLICATE_BOOK_DETAIL
+        )
+    await increment_counters(current_user["_id"], books_total=1)
+    await record_book_change(current_user["_id"], None, new_book)
+    await bump_library_version(current_user["_id"], BOOKS)
     created_book = await db.books.find_one({"_id": result.inserted_id})     # Fetch created book
 
     return serialize_book(created_book)
 
 
-@router.get("/", response_model=BooksListResponse)
-async def list_books(
+@router.post("/bulk", response_model=BookBulkResponse)
+async def bulk_books(
+    request: BookBulkRequest,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Apply several set/favorite/unfavorite/delete operations in one request.
+    Targets are loaded with one $in query; the writes then go out concurrently,
+    one atomic write per operation scoped to the user. Each id may appear once.
+    Updates are guarded on the fields they were planned from - a book edited
+    in the meantime is reported as a conflict and left alone.
+    Cover images of deleted books are removed after the response is sent.
+    """
+
+    user_id = current_user["_id"]
+    operations = request.operations
+    results = [
+        {"id": op.id, "action": op.action, "status": "ok", "detail": None} for op in operations
+    ]
+
+    def reject(index: int, result_status: str, detail: str):
+        results[index]["status"] = result_status
+        results[index]["detail"] = detail
+
+    # Validate ids up front
+    seen = set()
+    targets = {}
+    for index, op in enumerate(operations):
+        if not ObjectId.is_valid(op.id):
+            reject(index, "invalid", "Invalid book ID")
+        elif op.id in seen:
+            reject(index, "invalid", "Duplicate book ID in request")
+        else:
+            seen.add(op.id)
+            targets[index] = ObjectId(op.id)
+
+    existing = {}
+    if targets:
+        cursor = db.books.find({"_id": {"$in": list(targets.values())}, "user_id": user_id})
+        existing = {book["_id"]: book async for book in cursor}
+
+    now = datetime.now(timezone.utc)
+
+    async def apply(index: int, book: dict) -> tuple[dict, dict | None] | None:
+        """Run one operation; returns the confirmed (before, after) pair or None"""
+        op = operations[index]
+
+        try:
+            if op.action == "delete":
+                # The deleted document itself is the exact "before"
+                before = await db.books.find_one_and_delete({"_id": book["_id"], "user_id": user_id})
+                if before is None:
+                    reject(index, "not_found", "Book not found")
+                    return None
+                return before, None
+
+            if op.action == "set":
+                changes = {
+                    k: v for k, v in (op.fields.model_dump(exclude_unset=True) if op.fields else {}).items()
+                    if v is not None
+                }
+                if not changes:
+                    reject(index, "invalid", "No data to update")
+                    return None
+            else:
+                changes = {"is_favorite": op.action == "favorite"}
+
+            changes["updated_at"] = now
+            changes.update(derived_fields_for_update(book, changes))
+
+            # Counters and derived fields were computed from this snapshot
+            guard = {"_id": book["_id"], "user_id": user_id}
+            guard.update({field: book.get(field) for field in BULK_GUARD_FIELDS})
+
+            before = await db.books.find_one_and_update(
+                guard, {"$set": changes}, return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            reject(index, "conflict", DUPLICATE_BOOK_DETAIL)
+            return None
+        except PyMongoError as e:
+            reject(index, "failed", str(e))
+            return None
+
+        if before is None:
+            reject(index, "conflict", "The book was modified concurrently, please retry")
+            return None
+        return before, {**before, **as_stored(changes)}
+
+    pending = []
+    for index, book_id in targets.items():
+        book = existing.get(book_id)
+        if book is None:
+            reject(index, "not_found", "Book not found")
+        else:
+            pending.append(apply(index, book))
+
+    outcomes = await asyncio.gather(*pending)
+
+    # Derived data for the writes that went through
+    applied = [outcome for outcome in outcomes if outcome is not None]
+
+    if applied:
+        was_favorite = sum(1 for before, _ in applied if before.get("is_favorite"))
+        is_favorite = sum(1 for _, after in applied if after and after.get("is_favorite"))
+        await increment_counters(
+            user_id,
+            books_total=-sum(1 for _, after in applied if after is None),
+            books_favorite=is_favorite - was_favorite
+        )
+        await record_book_changes(user_id, applied)
+        await record_deletions(user_id, BOOK, [before["_id"] for before, after in applied if after is None])
+        await bump_library_version(user_id, BOOKS)
+
+        for before, after in applied:
+            if after is None and before.get("cover_image"):
+                background_tasks.add_task(delete_cloudinary_image, before["cover_image"])
+
+    succeeded = sum(1 for result in results if result["status"] == "ok")
+
+    return {
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+    }
+
+
+# Sort options for listings and neighbor navigation (an _id tie-breaker is appended)
+BOOK_SORT_OPTIONS = {
+    "date_asc": [("reading_started", 1)],
+    "date_desc": [("reading_started", -1)],
+    "title_asc": [("title_lc", 1)],
+    "title_desc": [("title_lc", -1)],
+    "rating_desc": [("rating", -1)],
+    "author_asc": [("author_lc", 1)],
+    "author_desc": [("author_lc", -1)],
+}
+DEFAULT_BOOK_SORT = "date_desc"
+
+
+def book_filters(
     favorite: bool | None = Query(None),
     genre: str | None = Query(None),
     author: str | None = Query(None),
     rating_min: float | None = Query(None, ge=0, le=5),
     rating_max: float | None = Query(None, ge=0, le=5),
-    year: int | None = Query(None),
+    year: int | None = Query(None, ge=1, le=MAXYEAR - 1),
+    month: int | None = Query(None, ge=1, le=12, description="Requires year"),
+    started_from: datetime | None = Query(None, description="reading_started on or after (inclusive)"),
+    started_to: datetime | None = Query(None, description="reading_started before (exclusive)"),
     search: str | None = Query(None),
-    sort: str = Query("date_desc"),
-    page: int = Query(1, gt=0),
-    limit: int = Query(20, gt=0, le=100),
-    current_user: dict = Depends(get_current_active_user),
-):
-    """List user's books with filters and pagination"""
+) -> dict:
+    """Listing filters shared by list_books and neighbor navigation (query without user_id)"""
 
-    # Build query
-    query = {"user_id": current_user["_id"]}
+    query = {}
 
     if favorite is not None:
         query["is_favorite"] = favorite
 
-    if genre:
-        query["genre"] = {"$regex": genre, "$options": "i"}
+    # Free-text filter inputs - match anywhere in the value, ignoring case
+    if genre and fold(genre):
+        query["genre_lc"] = contains_filter(fold(genre))
 
-    if author:
-        query["author"] = {"$regex": author, "$options": "i"}
+    if author and fold(author):
+        query["author_lc"] = contains_filter(fold(author))
 
     if rating_min is not None or rating_max is not None:
         query["rating"] = {}
@@ -113,46 +343,85 @@ async def list_books(
         if rating_max is not None:
             query["rating"]["$lte"] = rating_max
 
-    if year:
-        query["$expr"] = {"$eq": [{"$year": "$reading_started"}, year]}
+    started_range = _reading_started_range(year, month, started_from, started_to)
+    if started_range:
+        query["reading_started"] = started_range
 
     if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"author": {"$regex": search, "$options": "i"}},
-        ]
+        terms = search_filter(search)
+        if terms:
+            query["terms"] = terms
+
+    return query
+
+
+@router.get("/", response_model=BooksListResponse)
+async def list_books(
+    request: Request,
+    filters: dict = Depends(book_filters),
+    sort: str = Query(DEFAULT_BOOK_SORT),
+    page: int = Query(1, gt=0),
+    limit: int = Query(20, gt=0, le=100),
+    cursor: str | None = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    include_total: bool = Query(True, description="Set false to skip counting filtered results"),
+    current_user: dict = Depends(get_current_active_user),
+):
+    """
+    List user's books with filters and pagination.
+    Pass `cursor` for keyset pagination (constant cost per page); `page` still works for old clients.
+    Unfiltered and favorite-only totals come from the per-user counters; other
+    filters run count_documents unless include_total=false, which returns total=null.
+    Supports If-None-Match: unchanged libraries get a 304 before any query runs.
+    """
+
+    etag = await library_etag(request, current_user["_id"], BOOKS)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Build query
+    query = {"user_id": current_user["_id"], **filters}
 
     # Build sort
-    sort_options = {
-        "date_asc": [("reading_started", 1)],
-        "date_desc": [("reading_started", -1)],
-        "title_asc": [("title", 1)],
-        "title_desc": [("title", -1)],
-        "rating_desc": [("rating", -1)],
-        "author_asc": [("author", 1)],
-        "author_desc": [("author", -1)],
-    }
-    sort_by = sort_options.get(sort, [("reading_started", -1)])
+    if sort not in BOOK_SORT_OPTIONS:
+        sort = DEFAULT_BOOK_SORT
+    sort_by = BOOK_SORT_OPTIONS[sort]
 
     # Count total
-    total = await db.books.count_documents(query)
-
-    # Calculate pagination
-    skip = (page - 1) * limit
-    pages = math.ceil(total / limit)
+    if set(query) <= {"user_id", "is_favorite"}:
+        counters = await get_counters(current_user["_id"])
+        favorite = query.get("is_favorite")
+        if favorite is None:
+            total = counters["books_total"]
+        elif favorite:
+            total = counters["books_favorite"]
+        else:
+            total = max(counters["books_total"] - counters["books_favorite"], 0)
+    elif include_total:
+        total = await db.books.count_documents(query)
+    else:
+        total = None
+
+    pages = math.ceil(total / limit) if total is not None else None
 
     # Fetch books
-    cursor = db.books.find(query).sort(sort_by).skip(skip).limit(limit)
-    books = await cursor.to_list(length=limit)
+    result = await fetch_page(
+        db.books, query, sort_by, sort_key=sort, limit=limit, page=page, cursor=cursor
+    )
 
-    return {
-        "books": [serialize_book(book) for book in books],
+    # Serialized items already match BooksListResponse - skip re-validation
+    response = ORJSONResponse({
+        "books": [serialize_book(book) for book in result["items"]],
         "total": total,
         "page": page,
         "pages": pages,
-        "has_next": page < pages,
-        "has_prev": page > 1,
-    }
+        "has_next": result["has_next"],
+        "has_prev": result["has_prev"],
+        "next_cursor": result["next_cursor"],
+        "prev_cursor": result["prev_cursor"],
+    })
+    set_etag(response, etag)
+
+    return response
 
 
 @router.get("/favorites", response_model=BooksListResponse)
@@ -165,7 +434,8 @@ async def list_favorite_books(
 
     query = {"user_id": current_user["_id"], "is_favorite": True}
 
-    total = await db.books.count_documents(query)
+    counters = await get_counters(current_user["_id"])
+    total = counters["books_favorite"]
     skip = (page - 1) * limit
     pages = math.ceil(total / limit)
 
@@ -174,102 +444,154 @@ async def list_favorite_books(
     )
     books = await cursor.to_list(length=limit)
 
-    return {
+    return ORJSONResponse({
         "books": [serialize_book(book) for book in books],
         "total": total,
         "page": page,
         "pages": pages,
         "has_next": page < pages,
         "has_prev": page > 1,
-    }
+        "next_cursor": None,
+        "prev_cursor": None,
+    })
 
 
-@router.get("/stats", response_model=BookStatsResponse)
-async def get_book_stats(current_user: dict = Depends(get_current_active_user)):
-    """Get user's reading statistics"""
-
+@router.get("/facets", response_model=BookFacetsResponse)
+async def get_book_facets_counts(
+    request: Request,
+    response: Response,
+    filters: dict = Depends(book_filters),
+    limit: int = Query(20, gt=0, le=100, description="Values per genre/author/year/format/language facet"),
+    current_user: dict = Depends(get_current_active_user),
+):
+    """
+    Filter sidebar counts under the active filters (same parameters as GET /books),
+    in one $facet aggregation. Each facet ignores its own filter, so the other values
+    stay visible with their counts. Cached per library version; supports If-None-Match.
+    """
+
+    version = await get_library_version(current_user["_id"], BOOKS)
+    etag = make_etag(BOOKS, version, request.url.path, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    return await get_book_facets(current_user["_id"], filters, version, limit)
+
+
+@router.get("/suggest", response_model=BookSuggestResponse)
+async def suggest_books(
+    field: Literal["title", "author", "genre"] = Query(...),
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, gt=0, le=20),
+    current_user: dict = Depends(get_current_active_user),
+):
+    """
+    Autocomplete distinct titles, authors or genres starting with `prefix` (case-insensitive).
+    Answered from the (user_id, <field>_lc, <field>) index alone - no regex, no document fetches.
+    """
+
+    folded_field, display_field = SUGGEST_FIELDS[field]
+    folded_prefix = prefix.lstrip().casefold()
+    if not folded_prefix:
+        return ORJSONResponse({"field": field, "suggestions": []})
+
+    # Sort in index order, then $group on the folded key with only $first over an indexed
+    # field: the server answers with a DISTINCT_SCAN, one index seek per distinct value
     pipeline = [
-        {"$match": {"user_id": current_user["_id"]}},
-        {
-            "$group": {
-                "_id": None,
-                "total_books": {"$sum": 1},
-                "books_finished": {
-                    "$sum": {"$cond": [{"$ne": ["$reading_finished", None]}, 1, 0]}
-                },
-                "favorite_books": {
-                    "$sum": {"$cond": ["$is_favorite", 1, 0]}
-                },
-                "books_rated_count": {
-                    "$sum": {"$cond": [{"$gt": ["$rating", 0]}, 1, 0]}
-                },
-                "average_rating": {
-                    "$avg": {"$cond": [{"$gt": ["$rating", 0]}, "$rating", "$$REMOVE"]}
-                },
-                "total_pages": {"$sum": "$page_count"},
-            }
-        },
+        {"$match": {"user_id": current_user["_id"], folded_field: prefix_range(folded_prefix)}},
+        {"$sort": {folded_field: 1, display_field: 1}},
+        {"$group": {"_id": f"${folded_field}", "value": {"$first": f"${display_field}"}}},
+        {"$sort": {"_id": 1}},
+        {"$limit": limit},
     ]
+    suggestions = [item["value"] async for item in db.books.aggregate(pipeline) if item["value"]]
 
-    result = await db.books.aggregate(pipeline).to_list(length=1)
-
-    if not result:
-        return {
-            "average_rating": 0.0,
-            "books_by_genre": {},
-            "books_by_year": {},
-            "books_finished": 0,
-            "books_rated_count": 0,
-            "books_reading": 0,
-            "favorite_books": 0,
-            "total_pages": 0,
-            "total_books": 0,
-        }
+    return ORJSONResponse({"field": field, "suggestions": suggestions})
 
-    stats = result[0]
 
-    # Get books by genre
-    genre_pipeline = [
-        {"$match": {"user_id": current_user["_id"], "genre": {"$ne": None}}},
-        {"$group": {"_id": "$genre", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-    ]
-    genres = await db.books.aggregate(genre_pipeline).to_list(length=None)
-    books_by_genre = {g["_id"]: g["count"] for g in genres}
-
-    # Get books by year
-    year_pipeline = [
-        {"$match": {"user_id": current_user["_id"]}},
-        {"$group": {"_id": {"$year": "$reading_started"}, "count": {"$sum": 1}}},
-        {"$sort": {"_id": -1}},
-    ]
-    years = await db.books.aggregate(year_pipeline).to_list(length=None)
-    books_by_year = {str(y["_id"]): y["count"] for y in years}
+@router.get("/stats", response_model=BookStatsResponse)
+async def get_book_stats(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get user's reading statistics (materialized, single point read; supports If-None-Match)"""
+
+    etag = await library_etag(request, current_user["_id"], BOOKS)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    return await get_user_stats(current_user["_id"])
 
-    return {
-        "average_rating": round(stats.get("average_rating", 0), 1),
-        "books_by_genre": books_by_genre,
-        "books_by_year": books_by_year,
-        "books_finished": stats["books_finished"],
-        "books_rated_count": stats.get("books_rated_count", 0) or 0,
-        "books_reading": stats["total_books"] - stats["books_finished"],
-        "favorite_books": stats["favorite_books"],
-        "total_books": stats["total_books"],
-        "total_pages": stats.get("total_pages", 0) or 0,
-    }
+
+@router.get("/changes", response_model=BookChangesResponse)
+async def get_book_changes(
+    since: str | None = Query(None, description="next_token from the previous sync; omit for a full sync"),
+    limit: int = Query(500, gt=0, le=1000),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Books created/updated and ids deleted since a sync token.
+    Keep calling with next_token while has_more; the final page carries the
+    deletions and a token for the next sync. 410 means resync from scratch.
+    """
+
+    changes = await fetch_changes(db.books, BOOK, current_user["_id"], since, limit, serialize_book)
+    return ORJSONResponse(changes)
+
+
+@router.get("/batch", response_model=BooksBatchResponse)
+async def get_books_batch(
+    ids: str = Query(..., description=f"Comma-separated book ids (max {MAX_BATCH_IDS})"),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get several books by id with one $in query (shared with concurrent lookups).
+    Books come back in the requested order; ids that don't resolve are listed in `missing`.
+    """
+
+    requested = list(dict.fromkeys(book_id.strip() for book_id in ids.split(",") if book_id.strip()))
+
+    if len(requested) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many ids (max {MAX_BATCH_IDS})"
+        )
+
+    valid_ids = [ObjectId(book_id) for book_id in requested if ObjectId.is_valid(book_id)]
+    found = await book_loader.load_many(current_user["_id"], valid_ids)
+
+    books = []
+    missing = []
+    for book_id in requested:
+        book = found.get(ObjectId(book_id)) if ObjectId.is_valid(book_id) else None
+        if book is None:
+            missing.append(book_id)
+        else:
+            books.append(serialize_book(book))
+
+    return ORJSONResponse({"books": books, "missing": missing})
 
 
 @router.get("/{book_id}", response_model=BookResponse)
 async def get_book(
     book_id: str,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get a single book by ID"""
+    """Get a single book by ID (supports If-None-Match)"""
 
     try:
-        book = await db.books.find_one(
-            {"_id": ObjectId(book_id), "user_id": current_user["_id"]}
-        )
+        etag = await library_etag(request, current_user["_id"], BOOKS)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        # Batched with concurrent lookups in the same tick
+        book = await book_loader.load(current_user["_id"], ObjectId(book_id))
 
         if not book:
             raise HTTPException(
@@ -293,16 +615,6 @@ async def update_book(
     """Update a book"""
 
     try:
-        # Check book exists and belongs to user
-        existing_book = await db.books.find_one(
-            {"_id": ObjectId(book_id), "user_id": current_user["_id"]}
-        )
-
-        if not existing_book:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
-            )
-
         update_data = {
             k: v for k, v in book_data.model_dump(exclude_unset=True).items() if v is not None
         }
@@ -315,16 +627,38 @@ async def update_book(
 
         update_data["updated_at"] = datetime.now(timezone.utc)
 
-        # Update book
-        await db.books.update_one({"_id": ObjectId(book_id)}, {"$set": update_data})
+        # Update book (ownership in the filter, derived fields kept in sync)
+        existing_book, updated_book = await update_with_derived(
+            db.books,
+            {"_id": ObjectId(book_id), "user_id": current_user["_id"]},
+            update_data,
+            DERIVED_SOURCE_FIELDS,
+            derived_fields_for_update,
+        )
+
+        if not existing_book:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
+            )
+
+        was_favorite = bool(existing_book.get("is_favorite", False))
+        is_favorite = bool(updated_book.get("is_favorite", False))
+        if is_favorite != was_favorite:
+            await increment_counters(
+                current_user["_id"], books_favorite=1 if is_favorite else -1
+            )
 
-        # Fetch updated book
-        updated_book = await db.books.find_one({"_id": ObjectId(book_id)})
+        await record_book_change(current_user["_id"], existing_book, updated_book)
+        await bump_library_version(current_user["_id"], BOOKS)
 
         return serialize_book(updated_book)
 
     except HTTPException:
         raise
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=DUPLICATE_BOOK_DETAIL
+        )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -355,7 +689,17 @@ async def delete_book(
                 print(f"Failed to delete image: {e}")
 
         # Delete book
-        await db.books.delete_one({"_id": ObjectId(book_id)})
+        result = await db.books.delete_one({"_id": ObjectId(book_id)})
+
+        if result.deleted_count:
+            await increment_counters(
+                current_user["_id"],
+                books_total=-1,
+                books_favorite=-1 if book.get("is_favorite") else 0
+            )
+            await record_book_change(current_user["_id"], book, None)
+            await record_deletions(current_user["_id"], BOOK, [book["_id"]])
+            await bump_library_version(current_user["_id"], BOOKS)
 
         return None
 
@@ -375,30 +719,33 @@ async def toggle_favorite(
     """Toggle book favorite status"""
 
     try:
-        book = await db.books.find_one(
-            {"_id": ObjectId(book_id), "user_id": current_user["_id"]}
+        # Flip server-side in one atomic write, so concurrent toggles can't lose an update
+        updated_book = await db.books.find_one_and_update(
+            {"_id": ObjectId(book_id), "user_id": current_user["_id"]},
+            [
+                {
+                    "$set": {
+                        "is_favorite": {"$not": ["$is_favorite"]},
+                        "updated_at": datetime.now(timezone.utc),
+                    }
+                }
+            ],
+            return_document=ReturnDocument.AFTER,
         )
 
-        if not book:
+        if not updated_book:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
             )
 
-        # Toggle favorite
-        new_favorite_status = not book.get("is_favorite", False)
-
-        await db.books.update_one(
-            {"_id": ObjectId(book_id)},
-            {
-                "$set": {
-                    "is_favorite": new_favorite_status,
-                    "updated_at": datetime.now(timezone.utc),
-                }
-            },
+        new_favorite_status = updated_book["is_favorite"]
+        await increment_counters(
+            current_user["_id"], books_favorite=1 if new_favorite_status else -1
         )
 
-        # Fetch updated book
-        updated_book = await db.books.find_one({"_id": ObjectId(book_id)})
+        book = {**updated_book, "is_favorite": not new_favorite_status}
+        await record_book_change(current_user["_id"], book, updated_book)
+        await bump_library_version(current_user["_id"], BOOKS)
 
         return serialize_book(updated_book)
 
@@ -419,39 +766,34 @@ async def upload_cover_image(
     """Upload book cover image"""
 
     try:
-        # Check book exists
-        book = await db.books.find_one(
-            {"_id": ObjectId(book_id), "user_id": current_user["_id"]}
+        if not ObjectId.is_valid(book_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid book ID"
+            )
+
+        # Upload new image
+        image_url = await upload_book_cover(file)
+        changes = {"cover_image": image_url, "updated_at": datetime.now(timezone.utc)}
+
+        # Swap it in, getting the old cover back from the same write
+        book = await db.books.find_one_and_update(
+            {"_id": ObjectId(book_id), "user_id": current_user["_id"]},
+            {"$set": changes},
+            return_document=ReturnDocument.BEFORE,
         )
 
         if not book:
+            await delete_cloudinary_image(image_url)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
             )
 
-        # Delete old image if exists
+        # Delete old image only once the new one is in place
         if book.get("cover_image"):
-            try:
-                await delete_cloudinary_image(book["cover_image"])
-            except Exception as e:
-                print(f"Failed to delete old image: {e}")
+            await delete_cloudinary_image(book["cover_image"])
 
-        # Upload new image
-        image_url = await upload_book_cover(file)
-
-        # Update book
-        await db.books.update_one(
-            {"_id": ObjectId(book_id)},
-            {
-                "$set": {
-                    "cover_image": image_url,
-                    "updated_at": datetime.now(timezone.utc),
-                }
-            },
-        )
-
-        # Fetch updated book
-        updated_book = await db.books.find_one({"_id": ObjectId(book_id)})
+        await bump_library_version(current_user["_id"], BOOKS)
+        updated_book = {**book, **as_stored(changes)}
 
         return serialize_book(updated_book)
 
@@ -461,51 +803,82 @@ async def upload_cover_image(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.get("/{book_id}/neighbors", response_model=BookNeighborsResponse)
+async def get_book_neighbors(
+    book_id: str,
+    filters: dict = Depends(book_filters),
+    sort: str = Query(DEFAULT_BOOK_SORT),
+    window: int = Query(1, ge=1, le=10, description="Neighbor ids returned on each side"),
+    wrap: bool = Query(False, description="Wrap around at either end of the list"),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get the previous and next book as listed by GET /books with the same filters and sort.
+    Both sides come from one aggregation, with _id breaking ties.
+    """
+
+    if not ObjectId.is_valid(book_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid book ID"
+        )
+
+    book = await book_loader.load(current_user["_id"], ObjectId(book_id))
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
+        )
+
+    if sort not in BOOK_SORT_OPTIONS:
+        sort = DEFAULT_BOOK_SORT
+
+    neighbors = await fetch_neighbors(
+        db.books,
+        {"user_id": current_user["_id"], **filters},
+        BOOK_SORT_OPTIONS[sort],
+        book,
+        window=window,
+        wrap=wrap,
+    )
+
+    return {
+        "prev": serialize_book(neighbors["prev"][0]) if neighbors["prev"] else None,
+        "next": serialize_book(neighbors["next"][0]) if neighbors["next"] else None,
+        "prev_ids": [str(item["_id"]) for item in neighbors["prev"]],
+        "next_ids": [str(item["_id"]) for item in neighbors["next"]],
+    }
+
+
 @router.get("/{book_id}/next", response_model=BookResponse)
 async def get_next_book(
     book_id: str,
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get the next book in the user's library"""
+    """Get the next book in the user's library (by reading_started, wrapping around)"""
 
     try:
         # Get current book
-        current_book = await db.books.find_one(
-            {"_id": ObjectId(book_id), "user_id": current_user["_id"]}
-        )
+        current_book = await book_loader.load(current_user["_id"], ObjectId(book_id))
 
         if not current_book:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
             )
 
-        # Find next book (by reading_started date, descending)
-        next_book = await db.books.find_one(
-            {
-                "user_id": current_user["_id"],
-                "_id": {"$ne": ObjectId(book_id)},
-                "reading_started": {"$lt": current_book["reading_started"]}
-            },
-            sort=[("reading_started", -1)]
+        neighbors = await fetch_neighbors(
+            db.books,
+            {"user_id": current_user["_id"]},
+            BOOK_SORT_OPTIONS["date_desc"],
+            current_book,
+            wrap=True,
         )
 
-        # If no next book found, get the first book (wrap around)
-        if not next_book:
-            next_book = await db.books.find_one(
-                {
-                    "user_id": current_user["_id"],
-                    "_id": {"$ne": ObjectId(book_id)}
-                },
-                sort=[("reading_started", -1)]
-            )
-
-        if not next_book:
+        if not neighbors["next"]:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, 
                 detail="No other books in library"
             )
 
-        return serialize_book(next_book)
+        return serialize_book(neighbors["next"][0])
 
     except HTTPException:
         raise
@@ -513,4 +886,3 @@ async def get_next_book(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
         )
-    
\ No newline at end of file
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, UploadFile, HTTPException, status, Depends, File, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
 from typing import Literal
 from io import BytesIO
 from datetime import datetime, timezone
@@ -7,22 +7,85 @@ import json
 
 from app.core.database import db
 from app.core.dependencies import get_current_active_user
+from app.core.import_jobs import submit_import_job, get_import_job, serialize_job
+from app.core.importer import import_batch, is_duplicate_error
 from app.utils.file_handlers import JSONHandler, CSVHandler
+from app.utils.serializers import serialize_book, serialize_wishlist
 
 
 router = APIRouter(tags=["Data Import/Export"])
 
 
+async def _import_batches(batches, user_id) -> dict:
+    """
+    Insert parsed import batches as they arrive.
+    Only the current batch (plus the first few errors) is held in memory.
+    A file error after some batches were committed is raised with the stats so
+    far, so the client knows part of the file was imported.
+    """
+    total = 0
+    imported_count = 0
+    skipped_duplicates = 0
+    failed = 0
+    real_errors = []
+    duplicate_errors = []
+
+    def stats() -> dict:
+        return {
+            "total": total,
+            "imported": imported_count,
+            "skipped_duplicates": skipped_duplicates,
+            "failed": failed,
+            "errors": (real_errors + duplicate_errors)[:10]  # Return first 10
+        }
+
+    try:
+        async for valid_books, errors, rows in batches:
+            total += len(valid_books) + len(errors)
+
+            inserted, errors = await import_batch(user_id, valid_books, errors, rows)
+            imported_count += inserted
+
+            # Separate duplicate errors from real errors for clearer messaging
+            for error in errors:
+                if is_duplicate_error(error):
+                    skipped_duplicates += 1
+                    if len(duplicate_errors) < 10:
+                        duplicate_errors.append(error)
+                else:
+                    failed += 1
+                    if len(real_errors) < 10:
+                        real_errors.append(error)
+    except HTTPException as e:
+        if not total:
+            raise
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={
+                "message": f"Import stopped after {total} rows: {e.detail}. The rest of the file was not imported.",
+                "partial": True,
+                "stats": stats()
+            }
+        )
+
+    return stats()
+
+
 @router.post("/import")
 async def import_books(
     file: UploadFile = File(...),
     format_type: Literal["json", "csv"] = Query(..., description="File format"),
+    batch_size: int = Query(500, ge=1, le=5000, description="Rows validated and inserted per batch"),
+    background: bool = Query(False, description="Queue as a background job and return its id"),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    Import books from JSON or CSV file.
-    Duplicate detection is based on matching title + author (case-insensitive).
+    Import books from JSON (array or NDJSON) or CSV file.
+    Duplicates are books with the same title, author and language (case-insensitive).
     Duplicates already in the library are skipped, not re-imported.
+    Rows are parsed, validated and inserted in batches of batch_size.
+    With background=true the file is spooled and a 202 with the job id is returned;
+    poll GET /data/import/{job_id} for progress.
     """
 
     if not file.filename:
@@ -33,10 +96,10 @@ async def import_books(
 
     file_ext = file.filename.rsplit('.', 1)[-1].lower()
 
-    if format_type == "json" and file_ext != "json":
+    if format_type == "json" and file_ext not in ("json", "ndjson", "jsonl"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File extension must be .json for JSON format"
+            detail="File extension must be .json, .ndjson or .jsonl for JSON format"
         )
 
     if format_type == "csv" and file_ext != "csv":
@@ -45,43 +108,30 @@ async def import_books(
             detail="File extension must be .csv for CSV format"
         )
 
+    if background:
+        try:
+            job = await submit_import_job(file, format_type, current_user["_id"], batch_size)
+        finally:
+            await file.close()
+
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "message": "Import queued",
+                "job_id": str(job["_id"]),
+                "status": job["status"]
+            }
+        )
+
     try:
-        # Parse file — pass db and user_id for deduplication
-        if format_type == "json":
-            valid_books, errors = await JSONHandler.parse_import(
-                file, user_id=current_user["_id"], db=db
-            )
-        else:
-            valid_books, errors = await CSVHandler.parse_import(
-                file, user_id=current_user["_id"], db=db
-            )
-
-        # Add user_id and timestamps to valid books
-        books_to_insert = []
-        for book in valid_books:
-            book["user_id"] = current_user["_id"]
-            book["created_at"] = datetime.now(timezone.utc)
-            book["updated_at"] = datetime.now(timezone.utc)
-            books_to_insert.append(book)
-
-        imported_count = 0
-        if books_to_insert:
-            result = await db.books.insert_many(books_to_insert)
-            imported_count = len(result.inserted_ids)
-
-        # Separate duplicate errors from real errors for clearer messaging
-        duplicate_errors = [e for e in errors if "Duplicate" in e.get("error", "")]
-        real_errors = [e for e in errors if "Duplicate" not in e.get("error", "")]
+        handler = JSONHandler if format_type == "json" else CSVHandler
+        batches = handler.parse_import_batches(file, batch_size=batch_size)
+
+        stats = await _import_batches(batches, current_user["_id"])
 
         return {
             "message": "Import completed",
-            "stats": {
-                "total": len(valid_books) + len(errors),
-                "imported": imported_count,
-                "skipped_duplicates": len(duplicate_errors),
-                "failed": len(real_errors),
-                "errors": (real_errors + duplicate_errors)[:10]  # Return first 10
-            }
+            "stats": stats
         }
 
     except HTTPException:
@@ -95,57 +145,61 @@ async def import_books(
         await file.close()
 
 
+@router.get("/import/{job_id}")
+async def get_import_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get progress and the full error list of a background import job"""
+
+    job = await get_import_job(job_id, current_user["_id"])
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+
+    return serialize_job(job)
+
+
+async def _export_cursor(query: dict, batch_size: int):
+    """
+    Yield serialized books straight from a Motor cursor.
+    Raises 404 up front (before streaming starts) when nothing matches.
+    """
+    if await db.books.find_one(query, {"_id": 1}) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No books found to export"
+        )
+
+    cursor = db.books.find(query).sort([("reading_started", -1)]).batch_size(batch_size)
+
+    async def books():
+        async for book in cursor:
+            yield serialize_book(book)
+
+    return books()
+
+
 @router.get("/export/json")
 async def export_books_json(
     include_favorites_only: bool = Query(False),
+    batch_size: int = Query(500, ge=1, le=5000, description="Books fetched and emitted per chunk"),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Export all books as JSON file"""
+    """Export all books as a streamed JSON file (constant memory)"""
 
     query = {"user_id": current_user["_id"]}
     if include_favorites_only:
         query["is_favorite"] = True
 
-    cursor = db.books.find(query).sort([("reading_started", -1)])
-    books = await cursor.to_list(length=None)
+    books = await _export_cursor(query, batch_size)
     username = current_user["user_name"]
-    print(f"Exporting {len(books)} books for user {username} (favorites only: {include_favorites_only})")
-
-    if not books:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No books found to export"
-        )
-
-    serialized_books = []
-    for book in books:
-        serialized_books.append({
-            "id": str(book["_id"]),
-            "title": book["title"],
-            "author": book.get("author"),
-            "isbn": book.get("isbn"),
-            "genre": book.get("genre"),
-            "rating": book.get("rating", 0.0),
-            "description": book.get("description"),
-            "cover_image": book.get("cover_image"),
-            "reading_started": book["reading_started"],
-            "reading_finished": book.get("reading_finished"),
-            "is_favorite": book.get("is_favorite", False),
-            "page_count": book.get("page_count"),
-            "publisher": book.get("publisher"),
-            "publication_year": book.get("publication_year"),
-            "language": book.get("language", "English"),
-            "format": book.get("format"),
-            "created_at": book["created_at"],
-            "updated_at": book["updated_at"]
-        })
-
-    json_content = JSONHandler.generate_export(serialized_books)
-    buffer = BytesIO(json_content.encode('utf-8'))
     filename = f"{username}_books_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
     return StreamingResponse(
-        buffer,
+        JSONHandler.stream_export(books, batch_size=batch_size),
         media_type="application/json",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -154,10 +208,11 @@ async def export_books_json(
 @router.get("/export/csv")
 async def export_books_csv(
     include_favorites_only: bool = Query(False),
+    batch_size: int = Query(500, ge=1, le=5000, description="Books fetched and emitted per chunk"),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    Export all books as CSV file.
+    Export all books as a streamed CSV file (constant memory).
     Includes cover_image URL, full ISO datetime strings for all date fields.
     """
 
@@ -165,44 +220,11 @@ async def export_books_csv(
     if include_favorites_only:
         query["is_favorite"] = True
 
-    cursor = db.books.find(query).sort([("reading_started", -1)])
-    books = await cursor.to_list(length=None)
-
-    if not books:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No books found to export"
-        )
-
-    serialized_books = []
-    for book in books:
-        serialized_books.append({
-            "id": str(book["_id"]),
-            "title": book["title"],
-            "author": book.get("author"),
-            "isbn": book.get("isbn"),
-            "genre": book.get("genre"),
-            "rating": book.get("rating", 0.0),
-            "description": book.get("description"),
-            "cover_image": book.get("cover_image"),
-            "reading_started": book["reading_started"],
-            "reading_finished": book.get("reading_finished"),
-            "is_favorite": book.get("is_favorite", False),
-            "page_count": book.get("page_count"),
-            "publisher": book.get("publisher"),
-            "publication_year": book.get("publication_year"),
-            "language": book.get("language", "English"),
-            "format": book.get("format"),
-            "created_at": book["created_at"],
-            "updated_at": book["updated_at"]
-        })
-
-    csv_content = CSVHandler.generate_export(serialized_books)
-    buffer = BytesIO(csv_content.encode('utf-8-sig'))  # BOM for Excel compatibility
+    books = await _export_cursor(query, batch_size)
     filename = f"books_backup_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
 
     return StreamingResponse(
-        buffer,
+        CSVHandler.stream_export(books, batch_size=batch_size),  # BOM for Excel compatibility
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -295,28 +317,7 @@ async def export_user_data_json(
     cursor = db.books.find({"user_id": current_user["_id"]}).sort([("reading_started", -1)])
     books = await cursor.to_list(length=None)
 
-    serialized_books = []
-    for book in books:
-        serialized_books.append({
-            "id": str(book["_id"]),
-            "title": book["title"],
-            "author": book.get("author"),
-            "isbn": book.get("isbn"),
-            "genre": book.get("genre"),
-            "rating": book.get("rating", 0.0),
-            "description": book.get("description"),
-            "cover_image": book.get("cover_image"),
-            "reading_started": book["reading_started"].isoformat() if book.get("reading_started") else None,
-            "reading_finished": book.get("reading_finished").isoformat() if book.get("reading_finished") else None,
-            "is_favorite": book.get("is_favorite", False),
-            "page_count": book.get("page_count"),
-            "publisher": book.get("publisher"),
-            "publication_year": book.get("publication_year"),
-            "language": book.get("language", "English"),
-            "format": book.get("format"),
-            "created_at": book["created_at"].isoformat() if book.get("created_at") else None,
-            "updated_at": book["updated_at"].isoformat() if book.get("updated_at") else None
-        })
+    serialized_books = [serialize_book(book) for book in books]
 
     # Get wishlist items if collection exists
     wishlist_items = []
@@ -324,20 +325,7 @@ async def export_user_data_json(
         wishlist_cursor = db.wishlist.find({"user_id": current_user["_id"]}).sort([("priority", -1)])
         wishlist = await wishlist_cursor.to_list(length=None)
         
-        for item in wishlist:
-            wishlist_items.append({
-                "id": str(item["_id"]),
-                "title": item["title"],
-                "author": item.get("author"),
-                "isbn": item.get("isbn"),
-                "genre": item.get("genre"),
-                "priority": item.get("priority", 1),
-                "notes": item.get("notes"),
-                "price": item.get("price"),
-                "where_to_buy": item.get("where_to_buy"),
-                "created_at": item["created_at"].isoformat() if item.get("created_at") else None,
-                "updated_at": item["updated_at"].isoformat() if item.get("updated_at") else None,
-            })
+        wishlist_items = [serialize_wishlist(item) for item in wishlist]
     except Exception as e:
         print(f"Wishlist export error: {e}")
 
@@ -0,0 +1,84 @@
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import StreamingResponse
+import asyncio
+import orjson
+
+from app.core.config import settings
+from app.core.dependencies import get_current_active_user
+from app.core.events import event_hub
+
+
+router = APIRouter(tags=["Events"])
+
+
+# Client reconnect delay after a dropped connection (milliseconds)
+RECONNECT_MS = 5000
+
+
+def _format_event(event: dict) -> bytes:
+    """One SSE frame, named after the event type"""
+    return b"event: " + event["type"].encode("ascii") + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+@router.get("/")
+async def stream_events(
+    request: Request,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Live library changes as Server-Sent Events (text/event-stream).
+
+    - `book` / `wishlist` events: {"op": "changed"} - the books or wishlist
+      changed; catch up through GET /books/changes or /wishlist/changes.
+    - `resync` event: events were missed (slow connection or stream restart);
+      catch up through /books/changes and /wishlist/changes. The connection
+      closes after a resync caused by a full queue.
+
+    Returns 503 when live events are unavailable - keep polling instead.
+    """
+
+    if not settings.LIVE_EVENTS_ENABLED or not event_hub.available:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Live events are not available"
+        )
+
+    subscription = event_hub.subscribe(current_user["_id"])
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many open event connections"
+        )
+
+    async def frames():
+        try:
+            yield f"retry: {RECONNECT_MS}\n\n".encode("ascii")
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.LIVE_EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Comment line - keeps proxies from timing out an idle connection
+                    yield b": ping\n\n"
+                    continue
+
+                yield _format_event(event)
+
+                if subscription.overflowed and subscription.queue.empty():
+                    break
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",      # Disable proxy buffering (nginx)
+        }
+    )
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, UploadFile, HTTPException, status, Depends, File
 from datetime import datetime, timezone
+from pymongo import ReturnDocument
 
-from app.core.cloudinary import upload_profile_picture, delete_cloudinary_image
+from app.core.cloudinary import upload_profile_picture as store_profile_picture, delete_cloudinary_image
+from app.core.counters import delete_counters
 from app.core.database import db
-from app.core.dependencies import get_current_active_user
-from app.core.security import get_password_hash, verify_password
+from app.core.stats import delete_user_stats
+from app.core.versions import delete_library_versions
+from app.core.dependencies import get_current_active_user, invalidate_user_cache
+from app.core.security import get_password_hash_async, verify_password_async
 from app.schemas.user import UserResponse, UserUpdateRequest, ChangePasswordRequest
 
 
@@ -61,14 +65,19 @@ async def update_profile(
     
     update_fields["updated_at"] = datetime.now(timezone.utc)
     
-    # Update user
-    await db.users.update_one(
+    # Update user and get the result back in one round trip
+    updated_user = await db.users.find_one_and_update(
         {"_id": current_user["_id"]},
-        {"$set": update_fields}
+        {"$set": update_fields},
+        return_document=ReturnDocument.AFTER
     )
+    invalidate_user_cache(current_user["_id"])
     
-    # Fetch updated user
-    updated_user = await db.users.find_one({"_id": current_user["_id"]})
+    if not updated_user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     
     return serialize_user(updated_user)
 
@@ -80,31 +89,34 @@ async def upload_profile_picture(
 ):
     """Upload profile picture"""
     
-    # Delete old picture if exists
-    if current_user.get("profile_picture"):
-        try:
-            await delete_cloudinary_image(current_user["profile_picture"])
-        except Exception as e:
-            print(f"Failed to delete old image: {e}")
-    
     # Upload new picture
-    image_url = await upload_profile_picture(file)
+    image_url = await store_profile_picture(file)
     
-    # Update user
-    await db.users.update_one(
+    # Swap it in, getting the current picture back from the same write
+    user = await db.users.find_one_and_update(
         {"_id": current_user["_id"]},
         {
             "$set": {
                 "profile_picture": image_url,
                 "updated_at": datetime.now(timezone.utc)
             }
-        }
+        },
+        return_document=ReturnDocument.BEFORE
     )
+    invalidate_user_cache(current_user["_id"])
     
-    # Fetch updated user
-    updated_user = await db.users.find_one({"_id": current_user["_id"]})
+    if not user:
+        await delete_cloudinary_image(image_url)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     
-    return serialize_user(updated_user)
+    # Delete old picture only once the new one is in place
+    if user.get("profile_picture"):
+        await delete_cloudinary_image(user["profile_picture"])
+    
+    return serialize_user({**user, "profile_picture": image_url})
 
 
 @router.delete("/picture")
@@ -135,6 +147,7 @@ async def delete_profile_picture(
             }
         }
     )
+    invalidate_user_cache(current_user["_id"])
     
     return {"message": "Profile picture deleted"}
 
@@ -147,22 +160,25 @@ async def change_password(
     """Change user password"""
 
     # Verify current password
-    if not verify_password(password_data.current_password, current_user["password"]):
+    if not await verify_password_async(password_data.current_password, current_user["password"]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
 
+    hashed_password = await get_password_hash_async(password_data.new_password)
+
     # Update password
     await db.users.update_one(
         {"_id": current_user["_id"]},
         {
             "$set": {
-                "password": get_password_hash(password_data.new_password),
+                "password": hashed_password,
                 "updated_at": datetime.now(timezone.utc)
             }
         }
     )
+    invalidate_user_cache(current_user["_id"])
 
     return {"message": "Password changed successfully"}
 
@@ -175,6 +191,9 @@ async def delete_account(
     
     # Delete all user's books
     await db.books.delete_many({"user_id": current_user["_id"]})
+    await delete_counters(current_user["_id"])
+    await delete_user_stats(current_user["_id"])
+    await delete_library_versions(current_user["_id"])
     
     # Delete profile picture if exists
     if current_user.get("profile_picture"):
@@ -185,5 +204,6 @@ async def delete_account(
     
     # Delete user
     await db.users.delete_one({"_id": current_user["_id"]})
+    invalidate_user_cache(current_user["_id"])
     
     return None
\ No newline at end of file
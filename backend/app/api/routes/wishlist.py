@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.responses import ORJSONResponse
 from bson import ObjectId
 from datetime import datetime, timezone
+from pymongo.errors import DuplicateKeyError
 import math
 
 from app.schemas.wishlist import (
@@ -8,32 +10,38 @@ from app.schemas.wishlist import (
     WishlistUpdateRequest,
     WishlistResponse,
     WishlistListResponse,
+    WishlistChangesResponse,
 )
+from app.core.changes import WISHLIST_ITEM, fetch_changes, record_deletions
+from app.core.counters import get_counters, increment_counters
 from app.core.database import db
+from app.core.mutations import update_with_derived
+from app.core.stats import record_book_change
+from app.core.versions import (
+    BOOKS,
+    WISHLIST,
+    bump_library_version,
+    etag_matches,
+    library_etag,
+    not_modified,
+    set_etag,
+)
 from app.core.dependencies import get_current_active_user
+from app.utils.book_fields import (
+    WISHLIST_DERIVED_SOURCE_FIELDS,
+    book_derived_fields,
+    fold,
+    wishlist_derived_fields,
+    wishlist_derived_fields_for_update,
+)
+from app.utils.pagination import fetch_page
+from app.utils.serializers import serialize_wishlist
+from app.utils.search import contains_filter, search_filter
 
 
 router = APIRouter(tags=["Wishlist"])
 
 
-# Helper function to serialize wishlist item
-def serialize_wishlist(item: dict) -> dict:
-    """Convert MongoDB document to WishlistResponse format"""
-    return {
-        "id": str(item["_id"]),
-        "title": item["title"],
-        "author": item.get("author"),
-        "isbn": item.get("isbn"),
-        "genre": item.get("genre"),
-        "priority": item.get("priority", 1),
-        "notes": item.get("notes"),
-        "price": item.get("price"),
-        "where_to_buy": item.get("where_to_buy"),
-        "created_at": item["created_at"],
-        "updated_at": item["updated_at"],
-    }
-
-
 @router.post("/", response_model=WishlistResponse, status_code=status.HTTP_201_CREATED)
 async def create_wishlist_item(
     item_data: WishlistCreateRequest, current_user: dict = Depends(get_current_active_user)
@@ -54,8 +62,11 @@ async def create_wishlist_item(
         "created_at": datetime.now(timezone.utc),
         "updated_at": datetime.now(timezone.utc),
     }
+    new_item.update(wishlist_derived_fields(new_item))
 
     result = await db.wishlist.insert_one(new_item)
+    await increment_counters(current_user["_id"], wishlist_total=1)
+    await bump_library_version(current_user["_id"], WISHLIST)
 
     # Fetch created item
     created_item = await db.wishlist.find_one({"_id": result.inserted_id})
@@ -65,30 +76,42 @@ async def create_wishlist_item(
 
 @router.get("/", response_model=WishlistListResponse)
 async def list_wishlist(
+    request: Request,
     genre: str | None = Query(None),
     priority: int | None = Query(None, ge=1, le=5),
     search: str | None = Query(None),
     sort: str = Query("priority_desc"),
     page: int = Query(1, gt=0),
     limit: int = Query(20, gt=0, le=100),
+    cursor: str | None = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    include_total: bool = Query(True, description="Set false to skip counting filtered results"),
     current_user: dict = Depends(get_current_active_user),
 ):
-    """List user's wishlist with filters and pagination"""
+    """
+    List user's wishlist with filters and pagination.
+    Pass `cursor` for keyset pagination (constant cost per page); `page` still works for old clients.
+    The unfiltered total comes from the per-user counters; filtered totals
+    run count_documents unless include_total=false, which returns total=null.
+    Supports If-None-Match: an unchanged wishlist gets a 304 before any query runs.
+    """
+
+    etag = await library_etag(request, current_user["_id"], WISHLIST)
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
     # Build query
     query = {"user_id": current_user["_id"]}
 
-    if genre:
-        query["genre"] = {"$regex": genre, "$options": "i"}
+    if genre and fold(genre):
+        query["genre_lc"] = contains_filter(fold(genre))
 
     if priority is not None:
         query["priority"] = priority
 
     if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"author": {"$regex": search, "$options": "i"}},
-        ]
+        terms = search_filter(search)
+        if terms:
+            query["terms"] = terms
 
     # Build sort
     sort_options = {
@@ -96,30 +119,61 @@ async def list_wishlist(
         "date_asc": [("created_at", 1)],
         "priority_desc": [("priority", -1), ("created_at", -1)],
         "priority_asc": [("priority", 1), ("created_at", -1)],
-        "title_asc": [("title", 1)],
-        "title_desc": [("title", -1)],
+        "title_asc": [("title_lc", 1)],
+        "title_desc": [("title_lc", -1)],
     }
-    sort_by = sort_options.get(sort, [("priority", -1)])
+    if sort not in sort_options:
+        sort = "priority_desc"
+    sort_by = sort_options[sort]
 
     # Count total
-    total = await db.wishlist.count_documents(query)
-
-    # Calculate pagination
-    skip = (page - 1) * limit
-    pages = math.ceil(total / limit) if total > 0 else 1
+    if set(query) == {"user_id"}:
+        counters = await get_counters(current_user["_id"])
+        total = counters["wishlist_total"]
+    elif include_total:
+        total = await db.wishlist.count_documents(query)
+    else:
+        total = None
+
+    if total is None:
+        pages = None
+    else:
+        pages = math.ceil(total / limit) if total > 0 else 1
 
     # Fetch wishlist items
-    cursor = db.wishlist.find(query).sort(sort_by).skip(skip).limit(limit)
-    items = await cursor.to_list(length=limit)
+    result = await fetch_page(
+        db.wishlist, query, sort_by, sort_key=sort, limit=limit, page=page, cursor=cursor
+    )
 
-    return {
-        "wishlist": [serialize_wishlist(item) for item in items],
+    # Serialized items already match WishlistListResponse - skip re-validation
+    response = ORJSONResponse({
+        "wishlist": [serialize_wishlist(item) for item in result["items"]],
         "total": total,
         "page": page,
         "pages": pages,
-        "has_next": page < pages,
-        "has_prev": page > 1,
-    }
+        "has_next": result["has_next"],
+        "has_prev": result["has_prev"],
+        "next_cursor": result["next_cursor"],
+        "prev_cursor": result["prev_cursor"],
+    })
+    set_etag(response, etag)
+
+    return response
+
+
+@router.get("/changes", response_model=WishlistChangesResponse)
+async def get_wishlist_changes(
+    since: str | None = Query(None, description="next_token from the previous sync; omit for a full sync"),
+    limit: int = Query(500, gt=0, le=1000),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Wishlist items created/updated and ids removed since a sync token.
+    Same protocol as GET /books/changes.
+    """
+
+    changes = await fetch_changes(db.wishlist, WISHLIST_ITEM, current_user["_id"], since, limit, serialize_wishlist)
+    return ORJSONResponse(changes)
 
 
 @router.get("/{item_id}", response_model=WishlistResponse)
@@ -155,16 +209,6 @@ async def update_wishlist_item(
     """Update a wishlist item"""
 
     try:
-        # Check item exists and belongs to user
-        existing_item = await db.wishlist.find_one(
-            {"_id": ObjectId(item_id), "user_id": current_user["_id"]}
-        )
-
-        if not existing_item:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Wishlist item not found"
-            )
-
         update_data = {
             k: v for k, v in item_data.model_dump(exclude_unset=True).items() if v is not None
         }
@@ -177,12 +221,21 @@ async def update_wishlist_item(
 
         update_data["updated_at"] = datetime.now(timezone.utc)
 
-        # Update item
-        await db.wishlist.update_one({"_id": ObjectId(item_id)}, {"$set": update_data})
+        # Update item (ownership in the filter, derived fields kept in sync)
+        _, updated_item = await update_with_derived(
+            db.wishlist,
+            {"_id": ObjectId(item_id), "user_id": current_user["_id"]},
+            update_data,
+            WISHLIST_DERIVED_SOURCE_FIELDS,
+            wishlist_derived_fields_for_update,
+        )
 
-        # Fetch updated item
-        updated_item = await db.wishlist.find_one({"_id": ObjectId(item_id)})
+        if not updated_item:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Wishlist item not found"
+            )
 
+        await bump_library_version(current_user["_id"], WISHLIST)
         return serialize_wishlist(updated_item)
 
     except HTTPException:
@@ -209,7 +262,12 @@ async def delete_wishlist_item(
             )
 
         # Delete item
-        await db.wishlist.delete_one({"_id": ObjectId(item_id)})
+        result = await db.wishlist.delete_one({"_id": ObjectId(item_id)})
+
+        if result.deleted_count:
+            await increment_counters(current_user["_id"], wishlist_total=-1)
+            await record_deletions(current_user["_id"], WISHLIST_ITEM, [item["_id"]])
+            await bump_library_version(current_user["_id"], WISHLIST)
 
         return None
 
@@ -259,11 +317,28 @@ async def move_to_library(
             "created_at": datetime.now(timezone.utc),
             "updated_at": datetime.now(timezone.utc),
         }
+        new_book.update(book_derived_fields(new_book))
 
-        result = await db.books.insert_one(new_book)
+        try:
+            result = await db.books.insert_one(new_book)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This book is already in your library"
+            )
 
         # Delete from wishlist
-        await db.wishlist.delete_one({"_id": ObjectId(item_id)})
+        deleted = await db.wishlist.delete_one({"_id": ObjectId(item_id)})
+
+        await increment_counters(
+            current_user["_id"],
+            books_total=1,
+            wishlist_total=-1 if deleted.deleted_count else 0
+        )
+        await record_book_change(current_user["_id"], None, new_book)
+        if deleted.deleted_count:
+            await record_deletions(current_user["_id"], WISHLIST_ITEM, [item["_id"]])
+        await bump_library_version(current_user["_id"], BOOKS, WISHLIST)
 
         return {
             "message": "Book moved to library successfully",
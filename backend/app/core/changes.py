@@ -0,0 +1,143 @@
+from bson import ObjectId, json_util
+from datetime import datetime, timezone, timedelta
+from fastapi import HTTPException, status
+from typing import Callable, Iterable
+import base64
+import binascii
+import logging
+
+from app.core.config import settings
+from app.core.database import db
+
+
+logger = logging.getLogger(__name__)
+
+
+BOOK = "book"
+WISHLIST_ITEM = "wishlist"
+
+# Re-scan this far back at the end of a cycle, so writes whose updated_at was
+# stamped just before a sync but committed just after it are never missed.
+# Clients apply upserts idempotently, so the overlap only costs a few repeats.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+TOKEN_JSON_OPTIONS = json_util.JSONOptions(tz_aware=True, tzinfo=timezone.utc)
+
+
+async def record_deletions(user_id: ObjectId, kind: str, doc_ids: Iterable[ObjectId]):
+    """Leave tombstones for hard-deleted documents (call after the delete succeeded)"""
+    now = datetime.now(timezone.utc)
+    tombstones = [
+        {"user_id": user_id, "kind": kind, "doc_id": doc_id, "deleted_at": now}
+        for doc_id in doc_ids
+    ]
+    if not tombstones:
+        return
+
+    try:
+        await db.tombstones.insert_many(tombstones, ordered=False)
+    except Exception as e:
+        # Never fail the delete itself - the client only misses this deletion until a full resync
+        logger.warning(f"⚠️ Tombstone write failed for {user_id}: {e}")
+
+
+def _encode_token(cycle_start: datetime, after: datetime, after_id: ObjectId | None) -> str:
+    payload = {"s": cycle_start, "t": after, "i": after_id}
+    raw = json_util.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_token(token: str) -> tuple[datetime, datetime, ObjectId | None]:
+    """Returns: (cycle_start, after, after_id)"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json_util.loads(
+            base64.urlsafe_b64decode(padded.encode("ascii")),
+            json_options=TOKEN_JSON_OPTIONS
+        )
+        cycle_start, after, after_id = payload["s"], payload["t"], payload["i"]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        cycle_start = None
+
+    if not isinstance(cycle_start, datetime) or not isinstance(after, datetime) \
+            or not (after_id is None or isinstance(after_id, ObjectId)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+
+    return cycle_start, after, after_id
+
+
+async def fetch_changes(
+    collection,
+    kind: str,
+    user_id: ObjectId,
+    since: str | None,
+    limit: int,
+    serialize: Callable[[dict], dict],
+) -> dict:
+    """
+    One page of changes since a sync token (or everything, when since is None).
+    Upserts are paged by (updated_at, _id); deletions come from tombstones on the
+    page that closes the cycle. Tokens older than the tombstone TTL can no longer
+    vouch for deletions, so they get 410 and the client resyncs in full.
+
+    Returns dict with: upserts, deletions (ids), next_token, has_more
+    """
+    now = datetime.now(timezone.utc)
+    tombstones_from = now - timedelta(days=settings.CHANGES_TOMBSTONE_TTL_DAYS)
+
+    if since:
+        cycle_start, after, after_id = _decode_token(since)
+
+        if cycle_start < tombstones_from:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Sync token expired, a full sync is required"
+            )
+    else:
+        # A full sync is a cycle like any other: it starts now and its last page
+        # reports what was deleted while the client was paging through it
+        cycle_start, after, after_id = now - SYNC_OVERLAP, EPOCH, None
+
+    # Keyset on (updated_at, _id) - a token without an _id starts at its timestamp inclusive
+    if after_id is None:
+        position = {"updated_at": {"$gte": after}}
+    else:
+        position = {"$or": [
+            {"updated_at": {"$gt": after}},
+            {"updated_at": after, "_id": {"$gt": after_id}},
+        ]}
+
+    docs = await collection.find({"user_id": user_id, **position}) \
+        .sort([("updated_at", 1), ("_id", 1)]) \
+        .limit(limit + 1) \
+        .to_list(length=limit + 1)
+
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        return {
+            "upserts": [serialize(doc) for doc in docs],
+            "deletions": [],
+            "next_token": _encode_token(cycle_start, last["updated_at"], last["_id"]),
+            "has_more": True,
+        }
+
+    # TTL deletion is lazy - never report tombstones past their retention
+    cursor = db.tombstones.find(
+        {"user_id": user_id, "kind": kind, "deleted_at": {"$gte": max(cycle_start, tombstones_from)}},
+        {"doc_id": 1}
+    )
+    deletions = list(dict.fromkeys([str(tombstone["doc_id"]) async for tombstone in cursor]))
+
+    next_start = now - SYNC_OVERLAP
+    return {
+        "upserts": [serialize(doc) for doc in docs],
+        "deletions": deletions,
+        "next_token": _encode_token(next_start, next_start, None),
+        "has_more": False,
+    }
@@ -1,16 +1,10 @@
-import cloudinary
-import cloudinary.uploader
 from fastapi import UploadFile, HTTPException, status
-from app.core.config import settings
+import logging
 
+from app.core.storage import StorageError, get_storage
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME.get_secret_value(),
-    api_key=settings.CLOUDINARY_API_KEY.get_secret_value(),
-    api_secret=settings.CLOUDINARY_API_SECRET.get_secret_value(),
-    secure=True
-)
+
+logger = logging.getLogger(__name__)
 
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
@@ -24,36 +18,36 @@ def validate_image(file: UploadFile) -> bool:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid filename"
         )
-    
+
     ext = file.filename.rsplit('.', 1)[-1].lower()
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
         )
-    
+
     return True
 
 
 async def upload_book_cover(file: UploadFile) -> str:
-    """Upload book cover to Cloudinary"""
-    
+    """Upload book cover to the image storage backend"""
+
     # Validate
     validate_image(file)
-    
+
     try:
         # Read file content
         contents = await file.read()
-        
+
         # Check file size
         if len(contents) > MAX_FILE_SIZE:
             raise HTTPException(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
                 detail="File too large (max 10MB)"
             )
-        
-        # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
+
+        # Upload (runs on the image executor, not the event loop)
+        return await get_storage().upload(
             contents,
             folder="book_covers",
             transformation=[
@@ -61,12 +55,10 @@ async def upload_book_cover(file: UploadFile) -> str:
                 {'quality': 'auto:good'},
                 {'fetch_format': 'auto'}
             ],
-            timeout=60
+            extension=file.filename.rsplit('.', 1)[-1].lower()
         )
-        
-        return result['secure_url']
-        
-    except cloudinary.exceptions.Error as e:
+
+    except StorageError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Upload failed: {str(e)}"
@@ -76,20 +68,20 @@ async def upload_book_cover(file: UploadFile) -> str:
 
 
 async def upload_profile_picture(file: UploadFile) -> str:
-    """Upload profile picture to Cloudinary"""
-    
+    """Upload profile picture to the image storage backend"""
+
     validate_image(file)
-    
+
     try:
         contents = await file.read()
-        
+
         if len(contents) > 5 * 1024 * 1024:  # 5MB for profile pics
             raise HTTPException(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
                 detail="File too large (max 5MB)"
             )
-        
-        result = cloudinary.uploader.upload(
+
+        return await get_storage().upload(
             contents,
             folder="profile_pictures",
             transformation=[
@@ -97,12 +89,10 @@ async def upload_profile_picture(file: UploadFile) -> str:
                 {'quality': 'auto:good'},
                 {'fetch_format': 'auto'}
             ],
-            timeout=60
+            extension=file.filename.rsplit('.', 1)[-1].lower()
         )
-        
-        return result['secure_url']
-        
-    except cloudinary.exceptions.Error as e:
+
+    except StorageError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Upload failed: {str(e)}"
@@ -112,15 +102,8 @@ async def upload_profile_picture(file: UploadFile) -> str:
 
 
 async def delete_cloudinary_image(image_url: str):
-    """Delete image from Cloudinary"""
+    """Delete image from the image storage backend"""
     try:
-        # Extract public_id from URL
-        # https://res.cloudinary.com/cloud/image/upload/v123/folder/public_id.jpg
-        parts = image_url.split('/')
-        public_id_with_ext = '/'.join(parts[-2:])  # folder/public_id.jpg
-        public_id = public_id_with_ext.rsplit('.', 1)[0]  # folder/public_id
-        
-        cloudinary.uploader.destroy(public_id)
+        await get_storage().delete(image_url)
     except Exception as e:
-        print(f"Failed to delete image: {e}")
-        
\ No newline at end of file
+        logger.warning(f"Failed to delete image: {e}")
@@ -16,6 +16,14 @@ class Settings(BaseSettings):
     ALGORITHM: str = Field(default="HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=60)
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=30)
+    # Bearer token for /internal/stats (operational metrics); unset disables the endpoint
+    INTERNAL_STATS_TOKEN: SecretStr | None = Field(default=None)
+    
+    # Password hashing (dedicated process pool)
+    BCRYPT_ROUNDS: int = Field(default=12, ge=4, le=31)
+    PASSWORD_HASH_WORKERS: int = Field(default=2, ge=1)
+    PASSWORD_HASH_QUEUE_SIZE: int = Field(default=64, ge=0)
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = Field(default=10.0, gt=0)
     
     # Database
     MONGODB_URI: SecretStr
@@ -40,6 +48,13 @@ class Settings(BaseSettings):
     CLOUDINARY_API_SECRET: SecretStr
     CLOUDINARY_URL: SecretStr
     
+    # Image storage ("cloudinary" or "local" filesystem stand-in)
+    STORAGE_BACKEND: str = Field(default="cloudinary")
+    LOCAL_STORAGE_DIR: str = Field(default="uploads")
+    IMAGE_IO_WORKERS: int = Field(default=8, ge=1)
+    IMAGE_IO_CONCURRENCY: int = Field(default=8, ge=1)
+    IMAGE_IO_TIMEOUT_SECONDS: int = Field(default=60, gt=0)
+    
     # Frontend
     FRONTEND_URL: str = Field(default="http://localhost:5173")
     
@@ -47,6 +62,33 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = Field(default=50 * 1024 * 1024)  # 50MB
     MAX_IMAGE_SIZE: int = Field(default=10 * 1024 * 1024)   # 10MB
     
+    # Background imports (spool files stay on the accepting host)
+    IMPORT_SPOOL_DIR: str = Field(default="import_spool")
+    IMPORT_WORKERS: int = Field(default=2, ge=1)
+    IMPORT_MAX_JOBS_PER_USER: int = Field(default=1, ge=1)
+    IMPORT_JOB_STALE_SECONDS: int = Field(default=300, gt=0)
+    IMPORT_JOB_RETENTION_DAYS: int = Field(default=7, ge=1)
+    
+    # Delta sync (older sync tokens get 410 and must resync in full)
+    CHANGES_TOMBSTONE_TTL_DAYS: int = Field(default=30, ge=1)
+    
+    # Live events over SSE (MongoDB change streams need a replica set)
+    LIVE_EVENTS_ENABLED: bool = Field(default=True)
+    LIVE_EVENTS_QUEUE_SIZE: int = Field(default=100, ge=1)
+    LIVE_EVENTS_MAX_CONNECTIONS_PER_USER: int = Field(default=10, ge=1)
+    LIVE_EVENTS_HEARTBEAT_SECONDS: int = Field(default=15, gt=0)
+    
+    # Response compression (zstd/br when installed, else gzip)
+    COMPRESSION_MIN_SIZE: int = Field(default=1024, ge=0)
+    COMPRESSION_LEVEL: int = Field(default=5, ge=1)
+    COMPRESSION_EXPORT_LEVEL: int = Field(default=3, ge=1)  # Large streamed downloads favor throughput
+    
+    # Caching
+    USER_CACHE_MAX_SIZE: int = Field(default=10_000)
+    USER_CACHE_TTL_SECONDS: float = Field(default=30.0)
+    FACET_CACHE_MAX_SIZE: int = Field(default=2_000)
+    FACET_CACHE_TTL_SECONDS: float = Field(default=60.0)
+    
     # CORS
     CORS_ORIGINS: list = Field(default=["http://localhost:5173", "http://localhost:3000"])
     
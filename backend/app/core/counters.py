@@ -0,0 +1,130 @@
+from bson import ObjectId
+import logging
+
+from app.core.database import db
+
+
+logger = logging.getLogger(__name__)
+
+
+# Per-user totals kept up to date by every books/wishlist write path
+COUNTER_FIELDS = ("books_total", "books_favorite", "wishlist_total")
+
+# Recounts after seeding before giving up on a library that keeps changing
+SEED_RECOUNT_ATTEMPTS = 5
+
+
+async def _count_from_source(user_id: ObjectId, database=None) -> dict:
+    """Count a user's documents directly (slow path, used to seed and repair counters)"""
+    database = database if database is not None else db.db
+
+    return {
+        "books_total": await database.books.count_documents({"user_id": user_id}),
+        "books_favorite": await database.books.count_documents({"user_id": user_id, "is_favorite": True}),
+        "wishlist_total": await database.wishlist.count_documents({"user_id": user_id}),
+    }
+
+
+async def _seed_counters(user_id: ObjectId) -> dict:
+    """
+    Create a user's counter document from a count.
+    Increments skip a missing document, so writes landing while it is counted
+    can be lost: once it exists it is recounted, and a difference seen twice in
+    a row (not just an increment still in flight) is applied - guarded on the
+    stored values, so a concurrent increment makes it look again.
+    """
+    counts = await _count_from_source(user_id)
+    await db.user_counters.update_one({"_id": user_id}, {"$setOnInsert": counts}, upsert=True)
+
+    previous = None
+    for _ in range(SEED_RECOUNT_ATTEMPTS):
+        stored = await db.user_counters.find_one({"_id": user_id})
+        if stored is None:
+            # Dropped meanwhile (delete_counters) - the next read seeds again
+            return counts
+
+        stored = {field: stored.get(field, 0) for field in COUNTER_FIELDS}
+        counts = await _count_from_source(user_id)
+        if counts == stored:
+            return stored
+
+        if previous == (stored, counts):
+            drift = {field: counts[field] - stored[field] for field in COUNTER_FIELDS}
+            result = await db.user_counters.update_one(
+                {"_id": user_id, **stored},
+                {"$inc": {field: delta for field, delta in drift.items() if delta}}
+            )
+            if result.modified_count:
+                return counts
+
+        previous = (stored, counts)
+
+    logger.warning(f"⚠️ Counters for {user_id} did not settle while seeding")
+    return stored
+
+
+async def get_counters(user_id: ObjectId) -> dict:
+    """
+    Get a user's library counters.
+    Seeds the counter document from the collections on first access.
+    """
+    counters = await db.user_counters.find_one({"_id": user_id})
+
+    if counters is None:
+        counters = await _seed_counters(user_id)
+
+    return {field: max(counters.get(field, 0), 0) for field in COUNTER_FIELDS}
+
+
+async def increment_counters(user_id: ObjectId, **deltas: int):
+    """
+    Apply counter deltas, e.g. increment_counters(uid, books_total=1).
+    Users without a counter document are skipped; it is seeded on next read.
+    """
+    inc = {field: delta for field, delta in deltas.items() if delta}
+    if not inc:
+        return
+
+    unknown = set(inc) - set(COUNTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown counter fields: {', '.join(sorted(unknown))}")
+
+    try:
+        await db.user_counters.update_one({"_id": user_id}, {"$inc": inc})
+    except Exception as e:
+        # Counters are derived data - never fail the write that triggered them
+        logger.warning(f"⚠️ Counter update failed for {user_id}: {e}")
+        await delete_counters(user_id)
+
+
+async def rebuild_counters(user_id: ObjectId, database=None) -> dict:
+    """Recount a user's documents and overwrite the stored counters (repair routine)"""
+    database = database if database is not None else db.db
+
+    counts = await _count_from_source(user_id, database)
+    await database.user_counters.update_one({"_id": user_id}, {"$set": counts}, upsert=True)
+    return counts
+
+
+async def check_counters(user_id: ObjectId, database=None) -> dict:
+    """
+    Compare a user's stored counters against a fresh count
+    Returns: {field: (stored, expected)} for every mismatching field
+    """
+    database = database if database is not None else db.db
+
+    stored = await database.user_counters.find_one({"_id": user_id}) or {}
+    expected = await _count_from_source(user_id, database)
+
+    return {
+        field: (stored.get(field, 0), expected[field])
+        for field in COUNTER_FIELDS if stored.get(field, 0) != expected[field]
+    }
+
+
+async def delete_counters(user_id: ObjectId):
+    """Drop a user's counters (they will be re-seeded on next read)"""
+    try:
+        await db.user_counters.delete_one({"_id": user_id})
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to drop counters for {user_id}: {e}")
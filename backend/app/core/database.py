@@ -51,8 +51,64 @@ class Database:
             # Books collection indexes
             await self._db.books.create_index("user_id")
             await self._db.books.create_index([("user_id", 1), ("is_favorite", 1)])
-            await self._db.books.create_index([("user_id", 1), ("reading_started", -1)])
-            await self._db.books.create_index([("user_id", 1), ("title", 1)])
+            # Keyset pagination: one (user_id, sort key, _id) index per sort option
+            await self._db.books.create_index([("user_id", 1), ("reading_started", -1), ("_id", -1)])
+            await self._db.books.create_index([("user_id", 1), ("title_lc", 1), ("_id", 1)])
+            await self._db.books.create_index([("user_id", 1), ("author_lc", 1), ("_id", 1)])
+            await self._db.books.create_index([("user_id", 1), ("rating", -1), ("_id", -1)])
+
+            # Case-insensitive genre/author filters on the case-folded *_lc fields,
+            # with the default date sort following the equality prefix (no in-memory SORT)
+            await self._db.books.create_index([("user_id", 1), ("genre_lc", 1), ("reading_started", -1), ("_id", -1)])
+            await self._db.books.create_index([("user_id", 1), ("author_lc", 1), ("reading_started", -1), ("_id", -1)])
+
+            # Import/create deduplication - partial so documents predating the field
+            # don't collide (migrations/backfill_dedup_keys.py fills them in)
+            await self._db.books.create_index(
+                [("user_id", 1), ("dedup_key", 1)],
+                unique=True,
+                partialFilterExpression={"dedup_key": {"$exists": True}}
+            )
+
+            # Title/author search - multikey over the normalized words (app/utils/search.py)
+            await self._db.books.create_index([("user_id", 1), ("terms", 1)])
+
+            # Autocomplete - covering indexes for distinct scans over a prefix range (/books/suggest)
+            await self._db.books.create_index([("user_id", 1), ("title_lc", 1), ("title", 1)])
+            await self._db.books.create_index([("user_id", 1), ("author_lc", 1), ("author", 1)])
+            await self._db.books.create_index([("user_id", 1), ("genre_lc", 1), ("genre", 1)])
+
+            # Delta sync - changes since a token, in (updated_at, _id) order (app/core/changes.py)
+            await self._db.books.create_index([("user_id", 1), ("updated_at", 1), ("_id", 1)])
+
+            # Wishlist collection indexes
+            await self._db.wishlist.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+            await self._db.wishlist.create_index([("user_id", 1), ("priority", -1), ("created_at", -1), ("_id", -1)])
+            await self._db.wishlist.create_index([("user_id", 1), ("priority", 1), ("created_at", -1), ("_id", -1)])
+            await self._db.wishlist.create_index([("user_id", 1), ("title_lc", 1), ("_id", 1)])
+            await self._db.wishlist.create_index([("user_id", 1), ("genre_lc", 1), ("priority", -1), ("created_at", -1), ("_id", -1)])
+            await self._db.wishlist.create_index([("user_id", 1), ("terms", 1)])
+            await self._db.wishlist.create_index([("user_id", 1), ("updated_at", 1), ("_id", 1)])
+            
+            # Background import jobs - finished jobs and their errors expire after the retention period
+            retention_seconds = settings.IMPORT_JOB_RETENTION_DAYS * 24 * 3600
+            await self._db.import_jobs.create_index([("user_id", 1), ("status", 1)])
+            # Per-user concurrency limit - active jobs each hold a slot (app/core/import_jobs.py)
+            await self._db.import_jobs.create_index(
+                [("user_id", 1), ("active_slot", 1)],
+                unique=True,
+                partialFilterExpression={"active_slot": {"$type": "int"}}
+            )
+            await self._db.import_jobs.create_index([("status", 1), ("heartbeat_at", 1)])
+            await self._db.import_jobs.create_index([("host", 1), ("status", 1), ("created_at", 1)])
+            await self._db.import_jobs.create_index("finished_at", expireAfterSeconds=retention_seconds)
+            await self._db.import_job_errors.create_index([("job_id", 1), ("row", 1)])
+            await self._db.import_job_errors.create_index("created_at", expireAfterSeconds=retention_seconds)
+
+            # Delete tombstones for delta sync - expire once no valid sync token predates them
+            tombstone_seconds = settings.CHANGES_TOMBSTONE_TTL_DAYS * 24 * 3600
+            await self._db.tombstones.create_index([("user_id", 1), ("kind", 1), ("deleted_at", 1)])
+            await self._db.tombstones.create_index("deleted_at", expireAfterSeconds=tombstone_seconds)
             
             logger.info("✅ Database indexes created")
             
@@ -81,6 +137,41 @@ class Database:
         """Books collection"""
         return self._db.books
 
+    @property
+    def wishlist(self):
+        """Wishlist collection"""
+        return self._db.wishlist
+
+    @property
+    def user_counters(self):
+        """Per-user library counters collection"""
+        return self._db.user_counters
+
+    @property
+    def user_stats(self):
+        """Materialized per-user reading stats collection"""
+        return self._db.user_stats
+
+    @property
+    def library_versions(self):
+        """Per-user books/wishlist version tokens (ETags)"""
+        return self._db.library_versions
+
+    @property
+    def import_jobs(self):
+        """Background import jobs collection"""
+        return self._db.import_jobs
+
+    @property
+    def import_job_errors(self):
+        """Per-row errors of background import jobs"""
+        return self._db.import_job_errors
+
+    @property
+    def tombstones(self):
+        """Deleted book/wishlist ids for delta sync"""
+        return self._db.tombstones
+
 
 # Global database instance
 db = Database()
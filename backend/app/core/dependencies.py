@@ -2,7 +2,10 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError
 from bson import ObjectId
+import hmac
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import decode_token
 from app.core.database import db
 
@@ -10,6 +13,18 @@ from app.core.database import db
 security = HTTPBearer()
 
 
+# Authenticated user documents, keyed by user id string
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_user_cache(user_id) -> None:
+    """Drop a cached user document - call after every write to the user"""
+    user_cache.invalidate(str(user_id))
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> dict:
@@ -22,6 +37,8 @@ async def get_current_user(
     - User existence
     - Email verification
     - Account active status
+
+    User documents are served from a short-lived in-process cache.
     """
     try:
         token = credentials.credentials
@@ -39,12 +56,15 @@ async def get_current_user(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
             )
 
-        # Get user from database
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
+        # Get user from cache, falling back to the database
+        user = user_cache.get(user_id)
         if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-            )
+            user = await db.users.find_one({"_id": ObjectId(user_id)})
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+                )
+            user_cache.set(user_id, user)
 
         # Check verification status
         if not user.get("is_verified"):
@@ -60,7 +80,7 @@ async def get_current_user(
                 detail="Account deactivated. Contact support.",
             )
 
-        return user
+        return dict(user)  # Shallow copy so handlers can't mutate the cached entry
 
     except JWTError:
         raise HTTPException(
@@ -94,4 +114,25 @@ def get_optional_current_user(
         return get_current_user(credentials)
     except HTTPException:
         return None
-    
\ No newline at end of file
+    
+
+
+def require_internal_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(HTTPBearer(auto_error=False)),
+) -> None:
+    """
+    Guard internal-only endpoints with INTERNAL_STATS_TOKEN.
+    Answers 404 when the token is not configured, so the endpoint doesn't exist.
+    """
+    expected = settings.INTERNAL_STATS_TOKEN
+    if expected is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode("utf-8"), expected.get_secret_value().encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
@@ -0,0 +1,196 @@
+from bson import ObjectId
+from typing import Dict, Set
+import asyncio
+import logging
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.changes import BOOK, WISHLIST_ITEM
+from app.core.config import settings
+from app.core.database import db
+from app.core.versions import BOOKS, SCOPES, WISHLIST
+
+
+logger = logging.getLogger(__name__)
+
+
+# Tell the client to catch up through GET /books/changes and /wishlist/changes
+RESYNC = {"type": "resync"}
+
+# Change stream errors that mean the stream can't resume where it stopped
+CHANGE_STREAM_HISTORY_LOST = 286
+CHANGE_STREAM_FATAL = 280
+# Standalone servers have no oplog - change streams need a replica set
+CHANGE_STREAM_UNSUPPORTED = 40573
+
+RETRY_DELAY_SECONDS = 5
+
+# Every library write bumps the user's library_versions document (app/core/versions.py),
+# whose _id is the user id - so the change event itself names the user and the
+# changed scopes, with no document lookup. One event per write request, bulk or not,
+# and the stream is opened on that collection alone.
+WATCH_PIPELINE = [
+    {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+    {"$project": {
+        "operationType": 1,
+        "documentKey": 1,
+        "updateDescription.updatedFields": 1,
+        **{f"fullDocument.{scope}": 1 for scope in SCOPES},
+    }},
+]
+
+EVENT_TYPES = {BOOKS: BOOK, WISHLIST: WISHLIST_ITEM}
+
+
+class Subscription:
+    """One live connection: a bounded queue the change stream never waits on"""
+
+    def __init__(self, user_id: ObjectId, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, event: dict):
+        """
+        Queue an event without blocking. A subscriber that falls a full queue
+        behind gets one resync in place of its backlog and is closed - it
+        reconnects and catches up from its sync token instead.
+        """
+        if self.overflowed:
+            return
+
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class EventHub:
+    """
+    In-process fan-out of library change events to live connections.
+    Fed by a single change stream per worker process, whatever the number
+    of subscribers; delivery per connection goes through Subscription.offer.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[ObjectId, Set[Subscription]] = {}
+        self._task: asyncio.Task | None = None
+        self.available = False
+
+    def subscribe(self, user_id: ObjectId) -> Subscription | None:
+        """Register a connection (None when the user is at the connection limit)"""
+        if len(self._subscribers.get(user_id, ())) >= settings.LIVE_EVENTS_MAX_CONNECTIONS_PER_USER:
+            return None
+
+        subscription = Subscription(user_id, settings.LIVE_EVENTS_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Drop a connection"""
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: ObjectId, event: dict):
+        """Deliver an event to every connection of a user"""
+        for subscription in self._subscribers.get(user_id, ()):
+            subscription.offer(event)
+
+    def broadcast(self, event: dict):
+        """Deliver an event to every connection"""
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.offer(event)
+
+    def stats(self) -> dict:
+        """Live connection counts (for /internal/stats)"""
+        return {
+            "available": self.available,
+            "users": len(self._subscribers),
+            "connections": sum(len(subscribers) for subscribers in self._subscribers.values()),
+        }
+
+    def start(self):
+        """Open the change stream (application startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        """Close the change stream (application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.available = False
+
+    async def _watch(self):
+        """Tail the change stream, resuming after transient errors"""
+        resume_token = None
+
+        while True:
+            try:
+                async with db.library_versions.watch(WATCH_PIPELINE, resume_after=resume_token) as stream:
+                    if not self.available:
+                        self.available = True
+                        logger.info("✅ Live events change stream open")
+                        if resume_token is None:
+                            # Whatever happened while the stream was down is unknown
+                            self.broadcast(RESYNC)
+
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        try:
+                            self._dispatch(change)
+                        except Exception as e:
+                            # One malformed event must not stop the feed
+                            logger.error(f"❌ Live events dispatch failed: {e}", exc_info=True)
+
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAM_UNSUPPORTED:
+                    logger.warning("⚠️ Live events disabled: MongoDB change streams need a replica set")
+                    self.available = False
+                    return
+
+                logger.warning(f"⚠️ Live events change stream failed: {e}")
+                if e.code in (CHANGE_STREAM_HISTORY_LOST, CHANGE_STREAM_FATAL) or e.has_error_label("NonResumableChangeStreamError"):
+                    resume_token = None
+            except PyMongoError as e:
+                logger.warning(f"⚠️ Live events change stream interrupted: {e}")
+            except Exception as e:
+                # Anything unexpected - log it and reopen, never end the task silently
+                logger.error(f"❌ Live events change stream crashed: {e}", exc_info=True)
+
+            if resume_token is None:
+                self.available = False
+            await asyncio.sleep(RETRY_DELAY_SECONDS)
+
+    def _dispatch(self, change: dict):
+        """Turn a library version change into client events for its owner"""
+        user_id = change["documentKey"]["_id"]
+        if user_id not in self._subscribers:
+            return
+
+        operation = change["operationType"]
+        if operation == "update":
+            changed = change.get("updateDescription", {}).get("updatedFields", {})
+        elif operation == "delete":
+            changed = SCOPES     # Dropped after a failed bump - anything may have changed
+        else:
+            changed = change.get("fullDocument") or {}
+
+        for scope in SCOPES:
+            if scope in changed:
+                self.publish(user_id, {"type": EVENT_TYPES[scope], "op": "changed"})
+
+
+event_hub = EventHub()
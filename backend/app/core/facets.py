@@ -0,0 +1,108 @@
+from bson import ObjectId, json_util
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import db
+
+
+# Facet results, keyed by (user id, library version, filters, limit) - a write
+# issues a new version, so entries never outlive the data they were built from
+facet_cache = TTLCache(
+    maxsize=settings.FACET_CACHE_MAX_SIZE,
+    ttl=settings.FACET_CACHE_TTL_SECONDS
+)
+
+# Value facets: (stored field grouped on, field shown to the client)
+VALUE_FACETS = {
+    "genre": ("genre_lc", "genre"),
+    "author": ("author_lc", "author"),
+    "format": ("format", "format"),
+    "language": ("language", "language"),
+}
+
+# Filter keys each facet owns - a facet is counted without its own filter,
+# so picking a genre still shows how many books the other genres have
+OWN_FILTERS = {
+    "genre": "genre_lc",
+    "author": "author_lc",
+    "year": "reading_started",
+    "rating": "rating",
+}
+
+# Whole-star buckets: 0 = [0, 1) ... 4 = [4, 5), 5 = exactly 5
+RATING_BOUNDARIES = [0, 1, 2, 3, 4, 5]
+
+
+def _facet_pipeline(name: str, filters: dict, stages: list) -> list:
+    """Apply the active filters other than the facet's own, then the facet stages"""
+    other_filters = {
+        key: value for key, value in filters.items()
+        if key in OWN_FILTERS.values() and key != OWN_FILTERS.get(name)
+    }
+    return ([{"$match": other_filters}] if other_filters else []) + stages
+
+
+def _value_stages(field: str, label: str, limit: int) -> list:
+    return [
+        {"$match": {field: {"$nin": [None, ""]}}},
+        {"$group": {"_id": f"${field}", "value": {"$first": f"${label}"}, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0, "value": 1, "count": 1}},
+    ]
+
+
+def build_facet_pipeline(user_id: ObjectId, filters: dict, limit: int) -> list:
+    """
+    Single $facet aggregation over the user's books.
+    Filters no facet owns (favorite, search) narrow the input once; each facet
+    then applies the remaining active filters except its own.
+    """
+    base = {"user_id": user_id}
+    base.update({key: value for key, value in filters.items() if key not in OWN_FILTERS.values()})
+
+    facets = {
+        name: _facet_pipeline(name, filters, _value_stages(field, label, limit))
+        for name, (field, label) in VALUE_FACETS.items()
+    }
+
+    facets["year"] = _facet_pipeline("year", filters, [
+        {"$match": {"reading_started": {"$type": "date"}}},
+        {"$group": {"_id": {"$year": "$reading_started"}, "count": {"$sum": 1}}},
+        {"$sort": {"_id": -1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0, "value": "$_id", "count": 1}},
+    ])
+
+    facets["rating"] = _facet_pipeline("rating", filters, [
+        {"$match": {"rating": {"$type": "number"}}},
+        {"$bucket": {"groupBy": "$rating", "boundaries": RATING_BOUNDARIES, "default": RATING_BOUNDARIES[-1]}},
+        {"$sort": {"_id": -1}},
+        {"$project": {"_id": 0, "value": "$_id", "count": 1}},
+    ])
+
+    # Books matching every active filter
+    facets["total"] = _facet_pipeline(None, filters, [{"$count": "count"}])
+
+    return [{"$match": base}, {"$facet": facets}]
+
+
+async def get_book_facets(user_id: ObjectId, filters: dict, version: str, limit: int) -> dict:
+    """
+    Facet counts for a user's books under the given filters (cached per library version)
+    Returns dict with: genre, author, year, format, language, rating, total
+    """
+    cache_key = (user_id, version, json_util.dumps(filters), limit)
+    facets = facet_cache.get(cache_key)
+    if facets is not None:
+        return facets
+
+    result = await db.books.aggregate(build_facet_pipeline(user_id, filters, limit)).to_list(length=1)
+    facets = result[0] if result else {}
+
+    total = facets.pop("total", [])
+    facets = {name: facets.get(name, []) for name in (*VALUE_FACETS, "year", "rating")}
+    facets["total"] = total[0]["count"] if total else 0
+
+    facet_cache.set(cache_key, facets)
+    return facets
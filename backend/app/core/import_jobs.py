@@ -0,0 +1,360 @@
+from bson import ObjectId
+from datetime import datetime, timezone, timedelta
+from fastapi import UploadFile, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from pathlib import Path
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+from app.core.config import settings
+from app.core.database import db
+from app.core.importer import import_batch, is_duplicate_error
+from app.utils.file_handlers import JSONHandler, CSVHandler, FileHandler
+
+
+logger = logging.getLogger(__name__)
+
+
+# Spool files live on local disk, so jobs are only ever claimed on the host that accepted them.
+# Jobs of a host that stopped heartbeating (e.g. a container restarted under a new
+# hostname) can't be resumed anywhere else - any worker fails them instead.
+HOST = socket.gethostname()
+WORKER_ID = f"{HOST}:{os.getpid()}"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+ACTIVE_STATUSES = [JOB_QUEUED, JOB_RUNNING]
+
+SPOOL_CHUNK_SIZE = 1024 * 1024
+POLL_INTERVAL_SECONDS = 2.0
+ERROR_BACKOFF_SECONDS = 10.0
+
+HOST_LOST_ERROR = "Import interrupted: the server processing it went away. Please upload the file again."
+
+_workers: list[asyncio.Task] = []
+_heartbeat_task: asyncio.Task | None = None
+_wakeup: asyncio.Event | None = None
+
+
+def _spool_dir() -> Path:
+    path = Path(settings.IMPORT_SPOOL_DIR).resolve()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _copy_to_spool(source, destination: Path) -> int:
+    """Copy an upload to disk in chunks, enforcing the import size limit"""
+    written = 0
+    with open(destination, "wb") as target:
+        while True:
+            chunk = source.read(SPOOL_CHUNK_SIZE)
+            if not chunk:
+                return written
+
+            written += len(chunk)
+            if written > FileHandler.MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File too large. Maximum size is {FileHandler.MAX_FILE_SIZE / (1024*1024)}MB"
+                )
+            target.write(chunk)
+
+
+async def submit_import_job(
+    file: UploadFile, format_type: str, user_id: ObjectId, batch_size: int
+) -> dict:
+    """
+    Spool an upload to local disk and queue it for a background worker.
+    Active jobs hold one of IMPORT_MAX_JOBS_PER_USER slots, enforced by the unique
+    (user_id, active_slot) index, so concurrent submissions can't exceed the limit.
+    """
+
+    # Abandoned jobs must not hold a slot forever
+    await _fail_lost_jobs({"user_id": user_id})
+
+    path = _spool_dir() / f"{uuid.uuid4().hex}.{format_type}"
+    try:
+        await file.seek(0)
+        size = await run_in_threadpool(_copy_to_spool, file.file, path)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    now = datetime.now(timezone.utc)
+    job = {
+        "user_id": user_id,
+        "status": JOB_QUEUED,
+        "format_type": format_type,
+        "filename": file.filename,
+        "size": size,
+        "path": str(path),
+        "host": HOST,
+        "batch_size": batch_size,
+        "rows_processed": 0,
+        "inserted": 0,
+        "duplicates": 0,
+        "failed": 0,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "heartbeat_at": now,
+        "finished_at": None,
+    }
+
+    for slot in range(settings.IMPORT_MAX_JOBS_PER_USER):
+        job["active_slot"] = slot
+        job.pop("_id", None)
+        try:
+            result = await db.import_jobs.insert_one(job)
+            break
+        except DuplicateKeyError:
+            continue
+    else:
+        path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="An import is already in progress. Please wait for it to finish."
+        )
+    job["_id"] = result.inserted_id
+
+    if _wakeup is not None:
+        _wakeup.set()
+
+    return job
+
+
+async def get_import_job(job_id: str, user_id: ObjectId) -> dict | None:
+    """Get a job with its full error list (None if missing or not owned by the user)"""
+    if not ObjectId.is_valid(job_id):
+        return None
+
+    job = await db.import_jobs.find_one({"_id": ObjectId(job_id), "user_id": user_id})
+    if job is None:
+        return None
+
+    errors_cursor = db.import_job_errors.find(
+        {"job_id": job["_id"]}, {"_id": 0, "row": 1, "error": 1, "data": 1}
+    ).sort([("row", 1)])
+    job["errors"] = await errors_cursor.to_list(length=None)
+    return job
+
+
+def serialize_job(job: dict) -> dict:
+    """Convert an import job document to its API format"""
+    return {
+        "id": str(job["_id"]),
+        "status": job["status"],
+        "format_type": job["format_type"],
+        "filename": job.get("filename"),
+        "rows_processed": job.get("rows_processed", 0),
+        "inserted": job.get("inserted", 0),
+        "duplicates": job.get("duplicates", 0),
+        "failed": job.get("failed", 0),
+        "errors": job.get("errors", []),
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+    }
+
+
+def _stale_filter() -> dict:
+    """Active jobs whose heartbeat stopped (queued jobs are kept fresh by their host)"""
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+    return {
+        "status": {"$in": ACTIVE_STATUSES},
+        "$or": [
+            {"heartbeat_at": {"$lt": stale_before}},
+            {"heartbeat_at": None, "created_at": {"$lt": stale_before}},
+        ],
+    }
+
+
+async def _fail_lost_jobs(extra: dict | None = None):
+    """Fail stale jobs of other hosts - their spool file is out of reach"""
+    now = datetime.now(timezone.utc)
+    result = await db.import_jobs.update_many(
+        {**_stale_filter(), **(extra or {}), "host": {"$ne": HOST}},
+        {
+            "$set": {"status": JOB_FAILED, "error": HOST_LOST_ERROR, "finished_at": now, "updated_at": now},
+            "$unset": {"active_slot": ""},
+        }
+    )
+    if result.modified_count:
+        logger.warning(f"⚠️ Failed {result.modified_count} import jobs abandoned by other hosts")
+
+
+async def _claim_next_job() -> dict | None:
+    """
+    Atomically claim the oldest queued job for this host.
+    Running jobs whose heartbeat went stale (worker crashed/restarted) are reclaimed
+    and resume from their last checkpoint.
+    """
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+
+    return await db.import_jobs.find_one_and_update(
+        {
+            "host": HOST,
+            "$or": [
+                {"status": JOB_QUEUED},
+                {"status": JOB_RUNNING, "heartbeat_at": {"$lt": stale_before}},
+            ],
+        },
+        {
+            "$set": {
+                "status": JOB_RUNNING,
+                "worker": WORKER_ID,
+                "heartbeat_at": now,
+                "updated_at": now,
+            },
+            "$min": {"started_at": now},
+        },
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _finish_job(job: dict, status_value: str, error: str | None = None):
+    now = datetime.now(timezone.utc)
+    await db.import_jobs.update_one(
+        {"_id": job["_id"]},
+        {
+            "$set": {"status": status_value, "error": error, "finished_at": now, "updated_at": now},
+            "$unset": {"active_slot": ""},
+        }
+    )
+    Path(job["path"]).unlink(missing_ok=True)
+
+
+async def _run_job(job: dict):
+    """Parse, validate and insert a spooled file, checkpointing after every batch"""
+    handler = JSONHandler if job["format_type"] == "json" else CSVHandler
+    resume_from = job.get("rows_processed", 0)
+    rows_seen = 0
+
+    with open(job["path"], "rb") as spool:
+        upload = UploadFile(file=spool, filename=job.get("filename"))
+        batches = handler.parse_import_batches(upload, batch_size=job["batch_size"])
+
+        async for valid_books, errors, rows in batches:
+            batch_rows = len(valid_books) + len(errors)
+            rows_seen += batch_rows
+
+            # Batches are deterministic for a given batch_size - skip what was checkpointed.
+            # A batch interrupted before its checkpoint is replayed; the dedup index
+            # turns the already-inserted rows into duplicates.
+            if rows_seen <= resume_from:
+                continue
+
+            inserted, errors = await import_batch(job["user_id"], valid_books, errors, rows)
+            duplicates = sum(1 for error in errors if is_duplicate_error(error))
+
+            if errors:
+                await db.import_job_errors.insert_many([
+                    {**error, "job_id": job["_id"], "created_at": datetime.now(timezone.utc)}
+                    for error in errors
+                ])
+
+            now = datetime.now(timezone.utc)
+            await db.import_jobs.update_one(
+                {"_id": job["_id"]},
+                {
+                    "$inc": {
+                        "rows_processed": batch_rows,
+                        "inserted": inserted,
+                        "duplicates": duplicates,
+                        "failed": len(errors) - duplicates,
+                    },
+                    "$set": {"heartbeat_at": now, "updated_at": now},
+                }
+            )
+
+
+async def _worker_loop(worker_number: int):
+    """Claim and process jobs until cancelled"""
+    while True:
+        try:
+            await _fail_lost_jobs()
+            job = await _claim_next_job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Keep the worker alive through transient database errors
+            logger.error(f"❌ Import worker {worker_number} could not claim a job: {e}")
+            await asyncio.sleep(ERROR_BACKOFF_SECONDS)
+            continue
+
+        if job is None:
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        logger.info(f"📥 Import worker {worker_number} processing job {job['_id']}")
+        try:
+            await _run_job(job)
+            await _finish_job(job, JOB_COMPLETED)
+        except asyncio.CancelledError:
+            # Shutting down - hand the job back so the next start resumes it
+            await db.import_jobs.update_one(
+                {"_id": job["_id"], "status": JOB_RUNNING},
+                {"$set": {"status": JOB_QUEUED, "updated_at": datetime.now(timezone.utc)}}
+            )
+            raise
+        except HTTPException as e:
+            await _finish_job(job, JOB_FAILED, str(e.detail))
+        except Exception as e:
+            logger.error(f"❌ Import job {job['_id']} failed: {e}", exc_info=True)
+            await _finish_job(job, JOB_FAILED, f"Import failed: {str(e)}")
+
+
+async def _host_heartbeat_loop():
+    """Keep this host's queued jobs fresh, so other hosts know they will still run"""
+    interval = settings.IMPORT_JOB_STALE_SECONDS / 3
+    while True:
+        try:
+            now = datetime.now(timezone.utc)
+            await db.import_jobs.update_many(
+                {"host": HOST, "status": JOB_QUEUED},
+                {"$set": {"heartbeat_at": now}}
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Import queue heartbeat failed: {e}")
+        await asyncio.sleep(interval)
+
+
+async def start_import_workers():
+    """Start the background import worker pool (application startup)"""
+    global _wakeup, _heartbeat_task
+
+    _wakeup = asyncio.Event()
+    for number in range(settings.IMPORT_WORKERS):
+        _workers.append(asyncio.create_task(_worker_loop(number)))
+    _heartbeat_task = asyncio.create_task(_host_heartbeat_loop())
+
+    logger.info(f"✅ Started {settings.IMPORT_WORKERS} import workers")
+
+
+async def stop_import_workers():
+    """Stop the worker pool; in-flight jobs are re-queued and resume on next start"""
+    global _heartbeat_task
+
+    tasks = _workers + ([_heartbeat_task] if _heartbeat_task else [])
+    for task in tasks:
+        task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _workers.clear()
+    _heartbeat_task = None
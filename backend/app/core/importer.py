@@ -0,0 +1,81 @@
+from bson import ObjectId
+from datetime import datetime, timezone
+from pymongo.errors import BulkWriteError
+
+from app.core.counters import increment_counters
+from app.core.database import db
+from app.core.stats import record_books_added
+from app.core.versions import BOOKS, bump_library_version
+
+
+DUPLICATE_KEY_ERROR = 11000
+DUPLICATE_ERROR_MESSAGE = "Duplicate entry skipped (same title, author and book language already exists)"
+
+
+def is_duplicate_error(error: dict) -> bool:
+    """Whether an import error entry is a skipped duplicate"""
+    return "Duplicate" in error.get("error", "")
+
+
+async def _insert_batch(books: list[dict], rows: list[int]) -> tuple[list[dict], list[dict]]:
+    """
+    Insert a batch unordered; the (user_id, dedup_key) unique index rejects
+    duplicates (against the library and within the file) without a prior lookup.
+    Returns: (inserted_books, errors)
+    """
+    try:
+        await db.books.insert_many(books, ordered=False)
+        return books, []
+    except BulkWriteError as e:
+        failed = {}
+        errors = []
+
+        for write_error in e.details.get("writeErrors", []):
+            index = write_error["index"]
+            book = books[index]
+            failed[index] = True
+
+            if write_error.get("code") == DUPLICATE_KEY_ERROR:
+                message = DUPLICATE_ERROR_MESSAGE
+            else:
+                message = f"Insert failed: {write_error.get('errmsg', 'unknown error')}"
+
+            errors.append({
+                "row": rows[index],
+                "error": message,
+                "data": {"title": book.get("title", "Unknown"), "author": book.get("author") or "Unknown", "language": book.get("language", "English")}
+            })
+
+        inserted = [book for index, book in enumerate(books) if index not in failed]
+        return inserted, errors
+
+
+async def import_batch(
+    user_id: ObjectId, valid_books: list[dict], errors: list[dict], rows: list[int]
+) -> tuple[int, list[dict]]:
+    """
+    Insert one parsed import batch and update the derived per-user data
+    Returns: (imported_count, errors including insert-time duplicates)
+    """
+    if not valid_books:
+        return 0, errors
+
+    # Add user_id and timestamps to valid books
+    now = datetime.now(timezone.utc)
+    for book in valid_books:
+        book["user_id"] = user_id
+        book["created_at"] = now
+        book["updated_at"] = now
+
+    inserted_books, insert_errors = await _insert_batch(valid_books, rows)
+
+    if inserted_books:
+        await increment_counters(
+            user_id,
+            books_total=len(inserted_books),
+            books_favorite=sum(1 for book in inserted_books if book.get("is_favorite"))
+        )
+        await record_books_added(user_id, inserted_books)
+        await bump_library_version(user_id, BOOKS)
+
+    return len(inserted_books), errors + insert_errors
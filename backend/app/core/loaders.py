@@ -0,0 +1,92 @@
+from bson import ObjectId
+from typing import Dict, Iterable, List
+import asyncio
+import logging
+
+from app.core.database import db
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchLoader:
+    """
+    DataLoader-style batching of by-id lookups.
+    Every load issued during the same event-loop tick - from any number of
+    concurrent handlers - is coalesced into one {_id: {$in}} query per user.
+    Nothing is cached across ticks, so results are never stale.
+    """
+
+    def __init__(self, collection_name: str, max_batch_size: int = 1000):
+        self._collection_name = collection_name
+        self._max_batch_size = max_batch_size
+        self._pending: Dict[ObjectId, Dict[ObjectId, List[asyncio.Future]]] = {}
+        self._dispatch_scheduled = False
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, user_id: ObjectId, doc_id: ObjectId) -> dict | None:
+        """Load one document owned by user_id (None if missing)"""
+        docs = await self.load_many(user_id, [doc_id])
+        return docs.get(doc_id)
+
+    async def load_many(self, user_id: ObjectId, doc_ids: Iterable[ObjectId]) -> Dict[ObjectId, dict]:
+        """
+        Load documents owned by user_id
+        Returns: dict of _id -> document for the ids that exist
+        """
+        doc_ids = list(dict.fromkeys(doc_ids))
+        if not doc_ids:
+            return {}
+
+        loop = asyncio.get_running_loop()
+        user_pending = self._pending.setdefault(user_id, {})
+
+        futures = []
+        for doc_id in doc_ids:
+            future = loop.create_future()
+            user_pending.setdefault(doc_id, []).append(future)
+            futures.append(future)
+
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._dispatch)
+
+        docs = await asyncio.gather(*futures)
+        return {doc_id: doc for doc_id, doc in zip(doc_ids, docs) if doc is not None}
+
+    def _dispatch(self):
+        """Flush everything queued this tick (runs once per tick via call_soon)"""
+        pending, self._pending = self._pending, {}
+        self._dispatch_scheduled = False
+
+        for user_id, requests in pending.items():
+            doc_ids = list(requests)
+            for start in range(0, len(doc_ids), self._max_batch_size):
+                chunk = {doc_id: requests[doc_id] for doc_id in doc_ids[start:start + self._max_batch_size]}
+                task = asyncio.create_task(self._fetch(user_id, chunk))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, user_id: ObjectId, requests: Dict[ObjectId, List[asyncio.Future]]):
+        try:
+            collection = getattr(db, self._collection_name)
+            cursor = collection.find({"_id": {"$in": list(requests)}, "user_id": user_id})
+            found = {doc["_id"]: doc async for doc in cursor}
+        except Exception as e:
+            logger.warning(f"⚠️ Batched {self._collection_name} lookup failed: {e}")
+            for futures in requests.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for doc_id, futures in requests.items():
+            doc = found.get(doc_id)
+            for future in futures:
+                if not future.done():
+                    # Each caller gets its own copy to mutate freely
+                    future.set_result(dict(doc) if doc is not None else None)
+
+
+# Shared loaders
+book_loader = BatchLoader("books")
@@ -0,0 +1,63 @@
+from bson import decode, encode
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from typing import Callable, Dict, Tuple
+
+
+# Optimistic retries when a derived-source field changes under us
+MAX_UPDATE_ATTEMPTS = 3
+
+
+def as_stored(values: Dict) -> Dict:
+    """
+    Values as a read back from MongoDB would return them (BSON round trip):
+    datetimes come back naive UTC, truncated to milliseconds
+    """
+    return decode(encode(values))
+
+
+async def update_with_derived(
+    collection,
+    query: Dict,
+    update_data: Dict,
+    source_fields: set,
+    derive: Callable[[Dict, Dict], Dict],
+) -> Tuple[Dict | None, Dict | None]:
+    """
+    Atomically $set update_data (plus derived fields) on the document matching query.
+    Ownership belongs in query, so a foreign or missing document is simply no match.
+
+    Updates that touch no derived-source field are a single find_one_and_update.
+    Otherwise derived values need the current document: it is read once and the
+    write is guarded on the source fields still holding the values that were read.
+    A concurrent change to them makes the guard miss and the update is retried.
+
+    Returns: (before, after) documents, or (None, None) if nothing matched.
+    after is in stored form, exactly as a fresh read would return it.
+    """
+    if not source_fields & set(update_data):
+        before = await collection.find_one_and_update(
+            query, {"$set": update_data}, return_document=ReturnDocument.BEFORE
+        )
+        if before is None:
+            return None, None
+        return before, {**before, **as_stored(update_data)}
+
+    for _ in range(MAX_UPDATE_ATTEMPTS):
+        existing = await collection.find_one(query)
+        if existing is None:
+            return None, None
+
+        changes = {**update_data, **derive(existing, update_data)}
+        guard = {**query, **{field: existing.get(field) for field in source_fields}}
+
+        before = await collection.find_one_and_update(
+            guard, {"$set": changes}, return_document=ReturnDocument.BEFORE
+        )
+        if before is not None:
+            return before, {**before, **as_stored(changes)}
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="The item was modified concurrently, please retry"
+    )
@@ -1,12 +1,25 @@
 from fastapi import HTTPException, status
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.settings import settings
+import asyncio
+import logging
+import multiprocessing
+import time
+
+
+logger = logging.getLogger(__name__)
 
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 # JWT settings
@@ -26,6 +39,163 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# Dedicated bcrypt process pool - keeps hashing off the event loop and
+# out of the shared Starlette threadpool
+_hash_pool: ProcessPoolExecutor | None = None
+_hash_in_flight = 0
+_hash_metrics = {
+    "submitted": 0,
+    "completed": 0,
+    "rejected": 0,
+    "timeouts": 0,
+    "queue_wait_ms_total": 0.0,
+    "queue_wait_ms_max": 0.0,
+    "hash_ms_total": 0.0,
+    "hash_ms_max": 0.0,
+}
+
+
+def _timed_call(func, submitted_at: float, *args):
+    """Run a hashing function inside a pool worker and time it"""
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    """Get (lazily creating) the password hashing pool"""
+    global _hash_pool
+    if _hash_pool is None:
+        # Never fork the server process - its Motor/pymongo threads may hold locks
+        # at fork time and deadlock the child. forkserver forks a clean helper instead.
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context(start_method)
+        )
+    return _hash_pool
+
+
+def _discard_hash_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next call starts a fresh one (unless already replaced)"""
+    global _hash_pool
+    if _hash_pool is pool:
+        logger.error("❌ Password hashing pool is broken, restarting it")
+        _hash_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_hash_pool():
+    """Stop the password hashing pool (application shutdown)"""
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+
+def _release_hash_slot(_future=None):
+    global _hash_in_flight
+    _hash_in_flight -= 1
+
+
+def _record_hash_timing(queue_wait: float, hash_time: float):
+    queue_wait_ms = queue_wait * 1000
+    hash_ms = hash_time * 1000
+    _hash_metrics["completed"] += 1
+    _hash_metrics["queue_wait_ms_total"] += queue_wait_ms
+    _hash_metrics["queue_wait_ms_max"] = max(_hash_metrics["queue_wait_ms_max"], queue_wait_ms)
+    _hash_metrics["hash_ms_total"] += hash_ms
+    _hash_metrics["hash_ms_max"] = max(_hash_metrics["hash_ms_max"], hash_ms)
+
+
+async def _run_in_hash_pool(func, *args):
+    """
+    Run func in the hashing pool.
+    Rejects with 503 when workers + queue are saturated or the call times out.
+    A pool broken by a dying worker is rebuilt and the call retried once.
+    """
+    global _hash_in_flight
+
+    capacity = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE
+    if _hash_in_flight >= capacity:
+        _hash_metrics["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+
+    for attempt in range(2):
+        pool = _get_hash_pool()
+        try:
+            future = pool.submit(_timed_call, func, time.time(), *args)
+        except BrokenProcessPool:
+            # A worker died - start a fresh pool and try again
+            _discard_hash_pool(pool)
+            continue
+
+        _hash_in_flight += 1
+        _hash_metrics["submitted"] += 1
+
+        # The slot is held until the worker really finishes, even after a timeout
+        wrapped = asyncio.wrap_future(future)
+        wrapped.add_done_callback(_release_hash_slot)
+
+        try:
+            result, queue_wait, hash_time = await asyncio.wait_for(
+                asyncio.shield(wrapped), timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            _hash_metrics["timeouts"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy. Please try again shortly.",
+                headers={"Retry-After": "1"}
+            )
+        except BrokenProcessPool:
+            # The worker died mid-call - its result is lost, run it again on a fresh pool
+            _discard_hash_pool(pool)
+            continue
+
+        _record_hash_timing(queue_wait, hash_time)
+        return result
+
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy. Please try again shortly.",
+        headers={"Retry-After": "1"}
+    )
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash in the hashing pool"""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool"""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+def password_hash_stats() -> dict:
+    """Queue-wait and hash-time metrics for the hashing pool"""
+    completed = _hash_metrics["completed"]
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "queue_size": settings.PASSWORD_HASH_QUEUE_SIZE,
+        "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+        "in_flight": _hash_in_flight,
+        "submitted": _hash_metrics["submitted"],
+        "completed": completed,
+        "rejected": _hash_metrics["rejected"],
+        "timeouts": _hash_metrics["timeouts"],
+        "queue_wait_ms_avg": round(_hash_metrics["queue_wait_ms_total"] / completed, 2) if completed else 0.0,
+        "queue_wait_ms_max": round(_hash_metrics["queue_wait_ms_max"], 2),
+        "hash_ms_avg": round(_hash_metrics["hash_ms_total"] / completed, 2) if completed else 0.0,
+        "hash_ms_max": round(_hash_metrics["hash_ms_max"], 2),
+    }
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
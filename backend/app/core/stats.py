@@ -0,0 +1,289 @@
+from bson import ObjectId
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import unquote
+from pymongo.errors import DuplicateKeyError
+import logging
+
+from app.core.database import db
+
+
+logger = logging.getLogger(__name__)
+
+
+# Scalar counters stored on each user_stats document
+STAT_FIELDS = (
+    "total_books",
+    "books_finished",
+    "favorite_books",
+    "books_rated_count",
+    "rating_sum",
+    "total_pages",
+)
+
+# Stats rebuilds retried when the document changes under them
+REBUILD_ATTEMPTS = 5
+
+
+def _encode_key(key: str) -> str:
+    """Make a genre usable as a MongoDB field name ('.' and '$' are reserved)"""
+    return key.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def _decode_key(key: str) -> str:
+    """Reverse _encode_key"""
+    return unquote(key)
+
+
+def _utc_year(value: datetime) -> int:
+    """Calendar year of a datetime as MongoDB's $year sees it (UTC)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.year
+
+
+def book_contribution(book: dict | None, sign: int = 1) -> Counter:
+    """Counter deltas contributed by a single book document"""
+    deltas = Counter()
+    if not book:
+        return deltas
+
+    rating = book.get("rating") or 0
+
+    deltas["total_books"] += sign
+    if book.get("reading_finished") is not None:
+        deltas["books_finished"] += sign
+    if book.get("is_favorite"):
+        deltas["favorite_books"] += sign
+    if rating > 0:
+        deltas["books_rated_count"] += sign
+        deltas["rating_sum"] += sign * rating
+    deltas["total_pages"] += sign * (book.get("page_count") or 0)
+
+    if book.get("genre"):
+        deltas[f"genres.{_encode_key(book['genre'])}"] += sign
+    if book.get("reading_started") is not None:
+        deltas[f"years.{_utc_year(book['reading_started'])}"] += sign
+
+    return deltas
+
+
+def format_stats(doc: dict | None) -> dict:
+    """Convert a user_stats document to BookStatsResponse format"""
+    doc = doc or {}
+
+    genres = {
+        _decode_key(genre): count
+        for genre, count in (doc.get("genres") or {}).items() if count > 0
+    }
+    years = {year: count for year, count in (doc.get("years") or {}).items() if count > 0}
+
+    total_books = doc.get("total_books", 0)
+    books_finished = doc.get("books_finished", 0)
+    rated_count = doc.get("books_rated_count", 0)
+
+    return {
+        "average_rating": round(doc.get("rating_sum", 0) / rated_count, 1) if rated_count > 0 else 0.0,
+        "books_by_genre": dict(sorted(genres.items(), key=lambda item: item[1], reverse=True)),
+        "books_by_year": dict(sorted(years.items(), key=lambda item: item[0], reverse=True)),
+        "books_finished": books_finished,
+        "books_rated_count": rated_count,
+        "books_reading": total_books - books_finished,
+        "favorite_books": doc.get("favorite_books", 0),
+        "total_books": total_books,
+        "total_pages": doc.get("total_pages", 0),
+    }
+
+
+async def compute_user_stats(user_id: ObjectId, database=None) -> dict:
+    """
+    Compute a user's stats document from scratch with aggregations.
+    Used by rebuild/consistency checks only - requests read the materialized copy.
+    """
+    database = database if database is not None else db.db
+
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {
+            "$group": {
+                "_id": None,
+                "total_books": {"$sum": 1},
+                "books_finished": {
+                    "$sum": {"$cond": [{"$ne": [{"$ifNull": ["$reading_finished", None]}, None]}, 1, 0]}
+                },
+                "favorite_books": {
+                    "$sum": {"$cond": ["$is_favorite", 1, 0]}
+                },
+                "books_rated_count": {
+                    "$sum": {"$cond": [{"$gt": ["$rating", 0]}, 1, 0]}
+                },
+                "rating_sum": {
+                    "$sum": {"$cond": [{"$gt": ["$rating", 0]}, "$rating", 0]}
+                },
+                "total_pages": {"$sum": "$page_count"},
+            }
+        },
+    ]
+    result = await database.books.aggregate(pipeline).to_list(length=1)
+    totals = result[0] if result else {}
+
+    genre_pipeline = [
+        {"$match": {"user_id": user_id, "genre": {"$nin": [None, ""]}}},
+        {"$group": {"_id": "$genre", "count": {"$sum": 1}}},
+    ]
+    genres = await database.books.aggregate(genre_pipeline).to_list(length=None)
+
+    year_pipeline = [
+        {"$match": {"user_id": user_id, "reading_started": {"$ne": None}}},
+        {"$group": {"_id": {"$year": "$reading_started"}, "count": {"$sum": 1}}},
+    ]
+    years = await database.books.aggregate(year_pipeline).to_list(length=None)
+
+    stats = {field: totals.get(field) or 0 for field in STAT_FIELDS}
+    stats["genres"] = {_encode_key(g["_id"]): g["count"] for g in genres}
+    stats["years"] = {str(y["_id"]): y["count"] for y in years}
+    return stats
+
+
+async def rebuild_user_stats(user_id: ObjectId, database=None) -> dict:
+    """
+    Recompute and store a user's materialized stats (first read and repair).
+    The write is guarded on the version the stats were computed against, so
+    an increment landing meanwhile is never overwritten - it recomputes instead.
+    """
+    database = database if database is not None else db.db
+
+    for _ in range(REBUILD_ATTEMPTS):
+        stored = await database.user_stats.find_one({"_id": user_id}, {"version": 1})
+        stats = await compute_user_stats(user_id, database)
+        doc = {**stats, "version": ObjectId(), "rebuilt_at": datetime.now(timezone.utc)}
+
+        try:
+            if stored is None:
+                await database.user_stats.insert_one({"_id": user_id, **doc})
+            else:
+                result = await database.user_stats.replace_one(
+                    {"_id": user_id, "version": stored.get("version")}, doc
+                )
+                if not result.matched_count:
+                    continue
+        except DuplicateKeyError:
+            # Seeded concurrently - recompute against that document
+            continue
+
+        return doc
+
+    logger.warning(f"⚠️ Stats for {user_id} kept changing during rebuild")
+    return stats
+
+
+async def check_user_stats(user_id: ObjectId, database=None) -> dict:
+    """
+    Compare a user's materialized stats against a fresh computation
+    Returns: {field: (stored, expected)} for every mismatching field
+    """
+    database = database if database is not None else db.db
+
+    stored = await database.user_stats.find_one({"_id": user_id}) or {}
+    expected = await compute_user_stats(user_id, database)
+
+    mismatches = {}
+    for field in STAT_FIELDS:
+        stored_value = stored.get(field, 0)
+        if abs(stored_value - expected[field]) > 1e-6 * max(1, abs(expected[field])):
+            mismatches[field] = (stored_value, expected[field])
+
+    for field in ("genres", "years"):
+        stored_map = {k: v for k, v in (stored.get(field) or {}).items() if v}
+        if stored_map != expected[field]:
+            mismatches[field] = (stored_map, expected[field])
+
+    return mismatches
+
+
+async def get_user_stats(user_id: ObjectId) -> dict:
+    """
+    Get a user's stats (single point read by _id).
+    Builds the document on first access.
+    """
+    doc = await db.user_stats.find_one({"_id": user_id})
+
+    if doc is None:
+        doc = await _seed_user_stats(user_id)
+
+    return format_stats(doc)
+
+
+async def _seed_user_stats(user_id: ObjectId) -> dict:
+    """
+    Build a user's stats document.
+    Increments skip a missing document, so a write landing while it is built can
+    be lost: it is checked again, and drift seen twice in a row (not just an
+    increment still in flight) triggers a rebuild - now guarded on the version.
+    """
+    doc = await rebuild_user_stats(user_id)
+
+    previous = None
+    for _ in range(REBUILD_ATTEMPTS):
+        mismatches = await check_user_stats(user_id)
+        if not mismatches:
+            break
+        if mismatches == previous:
+            doc = await rebuild_user_stats(user_id)
+            break
+        previous = mismatches
+
+    return await db.user_stats.find_one({"_id": user_id}) or doc
+
+
+async def _apply_deltas(user_id: ObjectId, deltas: Counter):
+    """Apply counter deltas to an existing stats document"""
+    inc = {field: delta for field, delta in deltas.items() if delta}
+    if not inc:
+        return
+
+    try:
+        # No upsert: a missing document is rebuilt from scratch on next read.
+        # A new version makes a rebuild computed before this increment retry.
+        await db.user_stats.update_one(
+            {"_id": user_id}, {"$inc": inc, "$set": {"version": ObjectId()}}
+        )
+    except Exception as e:
+        # Stats are derived data - never fail the write that triggered them
+        logger.warning(f"⚠️ Stats update failed for {user_id}: {e}")
+        await delete_user_stats(user_id)
+
+
+async def record_book_change(user_id: ObjectId, before: dict | None, after: dict | None):
+    """
+    Update stats for a single book write.
+    Pass before=None for inserts and after=None for deletes.
+    """
+    deltas = book_contribution(after, 1)
+    deltas.update(book_contribution(before, -1))
+    await _apply_deltas(user_id, deltas)
+
+
+async def record_book_changes(user_id: ObjectId, changes: list[tuple[dict | None, dict | None]]):
+    """Update stats for a batch of (before, after) book writes in one update (bulk operations)"""
+    deltas = Counter()
+    for before, after in changes:
+        deltas.update(book_contribution(after, 1))
+        deltas.update(book_contribution(before, -1))
+    await _apply_deltas(user_id, deltas)
+
+
+async def record_books_added(user_id: ObjectId, books: list[dict]):
+    """Update stats for a batch of inserted books (import)"""
+    deltas = Counter()
+    for book in books:
+        deltas.update(book_contribution(book, 1))
+    await _apply_deltas(user_id, deltas)
+
+
+async def delete_user_stats(user_id: ObjectId):
+    """Drop a user's stats (they will be rebuilt on next read)"""
+    try:
+        await db.user_stats.delete_one({"_id": user_id})
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to drop stats for {user_id}: {e}")
@@ -0,0 +1,169 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+import asyncio
+import logging
+import uuid
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class StorageError(Exception):
+    """Raised when an image backend fails to store or delete a file"""
+
+
+class ImageStorage(ABC):
+    """
+    Base class for image storage backends (subclasses implement upload and delete).
+    Blocking SDK/filesystem calls run on a dedicated executor so they never
+    stall the event loop, and a semaphore caps concurrent transfers per process.
+    """
+
+    def __init__(self, workers: int, concurrency: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-io")
+        self._concurrency = concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        return self._semaphore
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking call on the image executor under the concurrency limit"""
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    @abstractmethod
+    async def upload(self, contents: bytes, folder: str, transformation: list[dict], extension: str) -> str:
+        """Store an image and return its public URL"""
+
+    @abstractmethod
+    async def delete(self, image_url: str) -> None:
+        """Delete an image by the URL returned from upload"""
+
+    def close(self):
+        """Release the executor (application shutdown)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class CloudinaryStorage(ImageStorage):
+    """Cloudinary backend - the SDK's HTTP connection pool is shared by the executor threads"""
+
+    def __init__(self, workers: int, concurrency: int, timeout: int):
+        super().__init__(workers, concurrency)
+        import cloudinary
+        import cloudinary.exceptions
+        import cloudinary.uploader
+
+        cloudinary.config(
+            cloud_name=settings.CLOUDINARY_CLOUD_NAME.get_secret_value(),
+            api_key=settings.CLOUDINARY_API_KEY.get_secret_value(),
+            api_secret=settings.CLOUDINARY_API_SECRET.get_secret_value(),
+            secure=True
+        )
+        self._uploader = cloudinary.uploader
+        self._sdk_error = cloudinary.exceptions.Error
+        self._timeout = timeout
+
+    async def upload(self, contents: bytes, folder: str, transformation: list[dict], extension: str) -> str:
+        try:
+            result = await self._run(
+                self._uploader.upload,
+                contents,
+                folder=folder,
+                transformation=transformation,
+                timeout=self._timeout
+            )
+        except self._sdk_error as e:
+            raise StorageError(str(e))
+
+        return result['secure_url']
+
+    async def delete(self, image_url: str) -> None:
+        # Extract public_id from URL
+        # https://res.cloudinary.com/cloud/image/upload/v123/folder/public_id.jpg
+        parts = image_url.split('/')
+        public_id_with_ext = '/'.join(parts[-2:])  # folder/public_id.jpg
+        public_id = public_id_with_ext.rsplit('.', 1)[0]  # folder/public_id
+
+        try:
+            await self._run(self._uploader.destroy, public_id, timeout=self._timeout)
+        except self._sdk_error as e:
+            raise StorageError(str(e))
+
+
+class LocalFileStorage(ImageStorage):
+    """Local filesystem stand-in for tests and benchmarks (transformations are ignored)"""
+
+    def __init__(self, root: str, workers: int, concurrency: int):
+        super().__init__(workers, concurrency)
+        self._root = Path(root).resolve()
+
+    def _write(self, path: Path, contents: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(contents)
+
+    async def upload(self, contents: bytes, folder: str, transformation: list[dict], extension: str) -> str:
+        path = self._root / folder / f"{uuid.uuid4().hex}.{extension}"
+        try:
+            await self._run(self._write, path, contents)
+        except OSError as e:
+            raise StorageError(str(e))
+
+        return path.as_uri()
+
+    async def delete(self, image_url: str) -> None:
+        path = Path(unquote(urlparse(image_url).path)).resolve()
+        if self._root not in path.parents:
+            raise StorageError(f"Not a local storage URL: {image_url}")
+
+        try:
+            await self._run(path.unlink, missing_ok=True)
+        except OSError as e:
+            raise StorageError(str(e))
+
+
+_storage: ImageStorage | None = None
+
+
+def get_storage() -> ImageStorage:
+    """Get the configured image storage backend (created on first use)"""
+    global _storage
+
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "local":
+            _storage = LocalFileStorage(
+                settings.LOCAL_STORAGE_DIR,
+                workers=settings.IMAGE_IO_WORKERS,
+                concurrency=settings.IMAGE_IO_CONCURRENCY
+            )
+        else:
+            _storage = CloudinaryStorage(
+                workers=settings.IMAGE_IO_WORKERS,
+                concurrency=settings.IMAGE_IO_CONCURRENCY,
+                timeout=settings.IMAGE_IO_TIMEOUT_SECONDS
+            )
+        logger.info(f"🖼️ Image storage backend: {type(_storage).__name__}")
+
+    return _storage
+
+
+def set_storage(storage: ImageStorage | None):
+    """Swap the storage backend (tests/benchmarks)"""
+    global _storage
+    if _storage is not None and _storage is not storage:
+        _storage.close()
+    _storage = storage
+
+
+def close_storage():
+    """Shut down the storage executor"""
+    set_storage(None)
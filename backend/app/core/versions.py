@@ -0,0 +1,103 @@
+from bson import ObjectId
+from fastapi import Request, Response, status
+from pymongo.errors import DuplicateKeyError
+import hashlib
+import logging
+
+from app.core.config import settings
+from app.core.database import db
+
+
+logger = logging.getLogger(__name__)
+
+
+# Library scopes with their own version; stats derive from books
+BOOKS = "books"
+WISHLIST = "wishlist"
+SCOPES = (BOOKS, WISHLIST)
+
+CACHE_CONTROL = "private, no-cache"
+
+
+async def get_library_version(user_id: ObjectId, scope: str) -> str:
+    """
+    Current version token of a user's books or wishlist.
+    Tokens are fresh ObjectIds rather than counters, so a lost or re-created
+    version document can never repeat a token an old ETag was built from.
+    """
+    versions = await db.library_versions.find_one({"_id": user_id}, {scope: 1})
+
+    if versions is None or scope not in versions:
+        try:
+            # Issue a token only if still missing, so concurrent readers agree on one
+            await db.library_versions.update_one(
+                {"_id": user_id, scope: {"$exists": False}},
+                {"$set": {scope: ObjectId()}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # Another request issued it first
+        versions = await db.library_versions.find_one({"_id": user_id}, {scope: 1})
+
+    return str(versions[scope])
+
+
+async def bump_library_version(user_id: ObjectId, *scopes: str):
+    """Invalidate ETags for a user's books and/or wishlist (call on every write)"""
+    try:
+        await db.library_versions.update_one(
+            {"_id": user_id},
+            {"$set": {scope: ObjectId() for scope in scopes}},
+            upsert=True
+        )
+    except Exception as e:
+        # A stale version would serve 304s for changed data - drop it instead
+        logger.warning(f"⚠️ Library version bump failed for {user_id}: {e}")
+        await delete_library_versions(user_id)
+
+
+async def delete_library_versions(user_id: ObjectId):
+    """Drop a user's versions (fresh tokens are issued on next read)"""
+    try:
+        await db.library_versions.delete_one({"_id": user_id})
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to drop library versions for {user_id}: {e}")
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over the given parts (and the API version, so serialization changes invalidate)"""
+    raw = "\x1f".join(str(part) for part in (settings.APP_VERSION, *parts))
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match matches etag (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+async def library_etag(request: Request, user_id: ObjectId, scope: str, *parts) -> str:
+    """ETag for a read of a user's library scope, varying with the path and query string"""
+    version = await get_library_version(user_id, scope)
+    return make_etag(scope, version, request.url.path, request.url.query, *parts)
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the validator"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def set_etag(response: Response, etag: str):
+    """Attach the validator to a full response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
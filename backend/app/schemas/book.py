@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
+from typing import Literal
 
 
 # Request Schemas
@@ -36,6 +37,16 @@ class BookUpdateRequest(BaseModel):
     format: str | None = None
 
 
+class BookBulkOperation(BaseModel):
+    id: str
+    action: Literal["set", "favorite", "unfavorite", "delete"]
+    fields: BookUpdateRequest | None = None  # Required for "set"
+
+
+class BookBulkRequest(BaseModel):
+    operations: list[BookBulkOperation] = Field(..., min_length=1, max_length=500)
+
+
 class BookFilterParams(BaseModel):
     favorite: bool | None = None
     genre: str | None = None
@@ -99,11 +110,65 @@ class BookResponse(BaseModel):
 
 class BooksListResponse(BaseModel):
     books: list[BookResponse]
-    total: int
+    total: int | None
     page: int
-    pages: int
+    pages: int | None
     has_next: bool
     has_prev: bool
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class BookNeighborsResponse(BaseModel):
+    prev: BookResponse | None
+    next: BookResponse | None
+    prev_ids: list[str]     # Up to `window` ids, nearest first (for prefetching)
+    next_ids: list[str]
+
+
+class BooksBatchResponse(BaseModel):
+    books: list[BookResponse]   # In requested order
+    missing: list[str]          # Unknown, foreign or malformed ids
+
+
+class BookChangesResponse(BaseModel):
+    upserts: list[BookResponse]
+    deletions: list[str]        # Ids deleted since the token (final page only)
+    next_token: str
+    has_more: bool
+
+
+class BookBulkResult(BaseModel):
+    id: str
+    action: str
+    status: Literal["ok", "not_found", "invalid", "conflict", "failed"]
+    detail: str | None = None
+
+
+class BookBulkResponse(BaseModel):
+    results: list[BookBulkResult]
+    succeeded: int
+    failed: int
+
+
+class FacetCount(BaseModel):
+    value: str | int
+    count: int
+
+
+class BookFacetsResponse(BaseModel):
+    genre: list[FacetCount]
+    author: list[FacetCount]
+    year: list[FacetCount]      # Year reading started
+    format: list[FacetCount]
+    language: list[FacetCount]
+    rating: list[FacetCount]    # Whole-star buckets: value <= rating < value + 1
+    total: int                  # Books matching every active filter
+
+
+class BookSuggestResponse(BaseModel):
+    field: Literal["title", "author", "genre"]
+    suggestions: list[str]      # Distinct values in case-insensitive alphabetical order
 
 
 class BookStatsResponse(BaseModel):
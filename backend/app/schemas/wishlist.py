@@ -43,8 +43,17 @@ class WishlistResponse(BaseModel):
 
 class WishlistListResponse(BaseModel):
     wishlist: list[WishlistResponse]
-    total: int
+    total: int | None
     page: int
-    pages: int
+    pages: int | None
     has_prev: bool
     has_next: bool
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class WishlistChangesResponse(BaseModel):
+    upserts: list[WishlistResponse]
+    deletions: list[str]        # Ids deleted or moved to the library since the token (final page only)
+    next_token: str
+    has_more: bool
@@ -1,10 +1,17 @@
 from app.utils.file_handlers import JSONHandler, CSVHandler
 from app.utils.validators import validate_isbn, validate_date_range
+from app.utils.pagination import fetch_page, fetch_neighbors
+from app.utils.search import contains_filter, prefix_range, search_filter
 
 
 __all__ = [
     'JSONHandler',
     'CSVHandler',
     'validate_isbn',
-    'validate_date_range'
+    'validate_date_range',
+    'fetch_page',
+    'fetch_neighbors',
+    'contains_filter',
+    'prefix_range',
+    'search_filter'
 ]
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Derived fields stored on book documents so indexes can serve lookups
+that would otherwise need a scan or in-memory processing.
+"""
+from typing import Dict
+
+from app.utils.search import search_fields
+
+
+# Fields a derived value is computed from - updates touching these must recompute
+DERIVED_SOURCE_FIELDS = {"title", "author", "language", "genre"}
+WISHLIST_DERIVED_SOURCE_FIELDS = {"title", "author", "genre"}
+
+# Case-folded shadow fields backing case-insensitive filters and sorts
+FOLDED_FIELDS = {"title": "title_lc", "author": "author_lc", "genre": "genre_lc"}
+
+
+def fold(value: str | None) -> str | None:
+    """Case-folded, trimmed form of a value for *_lc fields and the filters matching them"""
+    if value is None:
+        return None
+    return value.strip().casefold()
+
+
+def folded_fields(doc: Dict) -> Dict:
+    """The *_lc shadow fields for a (complete) book or wishlist document"""
+    return {target: fold(doc.get(source)) for source, target in FOLDED_FIELDS.items()}
+
+
+def dedup_key(title: str | None, author: str | None, language: str | None) -> str:
+    """
+    Normalized duplicate-detection key: title, author and language,
+    trimmed and case-insensitive. Backed by a unique (user_id, dedup_key) index.
+    """
+    return "\x1f".join((
+        (title or "").strip().lower(),
+        (author or "").strip().lower(),
+        (language or "english").strip().lower(),
+    ))
+
+
+def book_derived_fields(book: Dict) -> Dict:
+    """Compute every derived field for a (complete) book document"""
+    return {
+        "dedup_key": dedup_key(book.get("title"), book.get("author"), book.get("language")),
+        **search_fields(book),
+        **folded_fields(book),
+    }
+
+
+def derived_fields_for_update(existing: Dict, update_data: Dict) -> Dict:
+    """Derived fields to $set alongside an update, or {} if no source field changes"""
+    if not DERIVED_SOURCE_FIELDS & set(update_data):
+        return {}
+    return book_derived_fields({**existing, **update_data})
+
+
+def wishlist_derived_fields(item: Dict) -> Dict:
+    """Compute every derived field for a (complete) wishlist document"""
+    return {**search_fields(item), **folded_fields(item)}
+
+
+def wishlist_derived_fields_for_update(existing: Dict, update_data: Dict) -> Dict:
+    """Derived wishlist fields to $set alongside an update, or {} if no source field changes"""
+    if not WISHLIST_DERIVED_SOURCE_FIELDS & set(update_data):
+        return {}
+    return wishlist_derived_fields({**existing, **update_data})
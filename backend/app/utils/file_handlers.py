@@ -1,104 +1,222 @@
 import csv
+import io
 import json
+import textwrap
 from io import StringIO
+from itertools import islice
 from datetime import datetime, timezone
-from typing import List, Dict, Tuple
+from typing import AsyncIterable, AsyncIterator, List, Dict, Tuple
 from fastapi import UploadFile, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from bson import ObjectId
 
+from app.utils.book_fields import book_derived_fields
 
-class FileHandler:
-    """Base class for file handling"""
 
-    MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+class _SizeLimitedReader(io.RawIOBase):
+    """Raw reader over an upload spool that fails once more than `limit` bytes are read"""
 
-    @staticmethod
-    async def validate_file_size(file: UploadFile) -> bool:
-        """Validate file size"""
-        contents = await file.read()
-        file_size = len(contents)
-        await file.seek(0)  # Reset file pointer
+    def __init__(self, raw, limit: int):
+        self._raw = raw
+        self._limit = limit
+        self._consumed = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        size = len(data)
+        self._consumed += size
 
-        if file_size > FileHandler.MAX_FILE_SIZE:
+        if self._consumed > self._limit:
             raise HTTPException(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File too large. Maximum size is {FileHandler.MAX_FILE_SIZE / (1024*1024)}MB"
+                detail=f"File too large. Maximum size is {self._limit / (1024*1024)}MB"
             )
 
-        return True
+        buffer[:size] = data
+        return size
 
 
-class JSONHandler(FileHandler):
-    """Handle JSON file operations"""
+class FileHandler:
+    """Base class for file handling"""
+
+    MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
     @staticmethod
-    async def parse_import(file: UploadFile, user_id=None, db=None) -> Tuple[List[Dict], List[Dict]]:
+    def open_text_stream(file: UploadFile, encoding: str = "utf-8") -> io.TextIOWrapper:
         """
-        Parse JSON file for import
-        Returns: (valid_books, errors)
+        Incrementally decoding text view of an upload spool.
+        The size limit is enforced as bytes are read, nothing is buffered up front.
         """
-        await JSONHandler.validate_file_size(file)
+        limited = _SizeLimitedReader(file.file, FileHandler.MAX_FILE_SIZE)
+        return io.TextIOWrapper(io.BufferedReader(limited), encoding=encoding, newline="")
 
-        try:
-            contents = await file.read()
-            data = json.loads(contents.decode('utf-8'))
 
-            if not isinstance(data, list):
+class JSONHandler(FileHandler):
+    """Handle JSON file operations"""
+
+    READ_CHUNK_SIZE = 64 * 1024         # characters decoded per read
+    MAX_ENTRY_SIZE = 1024 * 1024        # a single book object may not exceed this
+
+    NDJSON_EXTENSIONS = ("ndjson", "jsonl")
+
+    @staticmethod
+    def iter_entries(stream: io.TextIOBase, ndjson: bool = False):
+        """
+        Incrementally parse a JSON array of books (or NDJSON, one object per line),
+        yielding one value at a time. Only the current read chunk plus one
+        partially received entry are held in memory.
+        A lone top-level object is only accepted as one-line NDJSON (ndjson=True).
+        """
+        decoder = json.JSONDecoder()
+        whitespace = " \t\r\n"
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = stream.read(JSONHandler.READ_CHUNK_SIZE)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace() -> bool:
+            """Skip to the next value; returns whether a line break was crossed"""
+            nonlocal pos
+            newline = False
+            while True:
+                while pos < len(buffer) and buffer[pos] in whitespace:
+                    newline = newline or buffer[pos] == "\n"
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return newline
+                fill()
+
+        def next_value():
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    # A scalar cut at a chunk boundary still decodes - require a lookahead char
+                    if end < len(buffer) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof or len(buffer) - pos > JSONHandler.MAX_ENTRY_SIZE:
+                        raise
+                fill()
+
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise json.JSONDecodeError("Expecting value", buffer, pos)
+
+        if buffer[pos] == "{":
+            first = next_value()
+            newline = skip_whitespace()
+
+            # A single object (e.g. a full account export) is not a list of books
+            if pos >= len(buffer) and not ndjson:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="JSON file must contain an array of books"
                 )
 
-            valid_books = []
-            errors = []
-            skipped_titles = []
+            # NDJSON: one object per line
+            yield first
+            while pos < len(buffer):
+                if not newline:
+                    raise json.JSONDecodeError("Expecting one object per line", buffer, pos)
+                yield next_value()
+                newline = skip_whitespace()
+            return
 
-            # Build existing books set for deduplication (title+author, case-insensitive)
-            existing_keys = set()
-            if db is not None and user_id is not None:
-                existing_cursor = db.books.find(
-                    {"user_id": user_id},
-                    {"title": 1, "author": 1, "language": 1}
-                )
-                async for book in existing_cursor:
-                    key = (
-                        (book.get("title") or "").strip().lower(),
-                        (book.get("author") or "").strip().lower(),
-                        (book.get("language") or "english").strip().lower()
-                    )
-                    existing_keys.add(key)
-
-            for idx, entry in enumerate(data, start=1):
-                try:
-                    book = JSONHandler._validate_book_entry(entry, idx)
-
-                    # Deduplication check
-                    dup_key = (
-                        (book.get("title") or "").strip().lower(),
-                        (book.get("author") or "").strip().lower(),
-                        (book.get("language") or "english").strip().lower()
-                    )
-                    
-                    if dup_key in existing_keys:
-                        skipped_titles.append(entry.get("title", "Unknown"))
+        if buffer[pos] != "[":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="JSON file must contain an array of books"
+            )
+
+        pos += 1
+        skip_whitespace()
+        if pos < len(buffer) and buffer[pos] == "]":
+            pos += 1
+        else:
+            while True:
+                skip_whitespace()
+                if pos >= len(buffer):
+                    raise json.JSONDecodeError("Expecting value", buffer, pos)
+                yield next_value()
+
+                skip_whitespace()
+                if pos >= len(buffer):
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                if buffer[pos] == "]":
+                    pos += 1
+                    break
+                if buffer[pos] != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos += 1
+
+        skip_whitespace()
+        if pos < len(buffer):
+            raise json.JSONDecodeError("Extra data", buffer, pos)
+
+    @staticmethod
+    async def parse_import_batches(
+        file: UploadFile, batch_size: int = 500
+    ) -> AsyncIterator[Tuple[List[Dict], List[Dict], List[int]]]:
+        """
+        Stream-parse a JSON array or NDJSON file for import
+        Yields: (valid_books, errors, row numbers of valid_books) for every batch_size entries
+        Duplicates are detected at insert time by the (user_id, dedup_key) unique index.
+        """
+        await file.seek(0)
+        stream = JSONHandler.open_text_stream(file, encoding="utf-8-sig")
+
+        try:
+            ndjson = (file.filename or "").rsplit(".", 1)[-1].lower() in JSONHandler.NDJSON_EXTENSIONS
+            entries = JSONHandler.iter_entries(stream, ndjson=ndjson)
+            idx = 0
+
+            while True:
+                batch = await run_in_threadpool(lambda: list(islice(entries, batch_size)))
+                if not batch:
+                    break
+
+                valid_books = []
+                valid_rows = []
+                errors = []
+
+                for entry in batch:
+                    idx += 1
+
+                    if not isinstance(entry, dict):
                         errors.append({
                             "row": idx,
-                            "error": f"Duplicate entry skipped (same title, author and book language already exists)",
-                            "data": {"title": entry.get("title", "Unknown"), "author": entry.get("author", "Unknown"), "language": entry.get("language", "English")}
+                            "error": "Book entry must be a JSON object",
+                            "data": {"title": "Unknown", "author": "Unknown", "language": "English"}
                         })
                         continue
 
-                    existing_keys.add(dup_key)  # prevent duplicates within the file itself
-                    valid_books.append(book)
+                    try:
+                        book = JSONHandler._validate_book_entry(entry, idx)
+                        book.update(book_derived_fields(book))
 
-                except ValueError as e:
-                    errors.append({
-                        "row": idx,
-                        "error": str(e),
-                        "data": {"title": entry.get("title", "Unknown"), "author": entry.get("author", "Unknown"), "language": entry.get("language", "English")}
-                    })
+                        valid_books.append(book)
+                        valid_rows.append(idx)
+
+                    except ValueError as e:
+                        errors.append({
+                            "row": idx,
+                            "error": str(e),
+                            "data": {"title": entry.get("title", "Unknown"), "author": entry.get("author", "Unknown"), "language": entry.get("language", "English")}
+                        })
 
-            return valid_books, errors
+                yield valid_books, errors, valid_rows
 
         except json.JSONDecodeError as e:
             raise HTTPException(
@@ -111,33 +229,44 @@ class JSONHandler(FileHandler):
                 detail="File encoding error. Please use UTF-8 encoding"
             )
 
+    @staticmethod
+    def _optional_str(entry: Dict, field: str) -> str | None:
+        """A trimmed text field - JSON null/empty gives None, numbers are kept as text"""
+        value = entry.get(field)
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(f"Invalid value for {field}")
+        return str(value).strip() or None
+
+    @staticmethod
+    def _optional_date(entry: Dict, field: str) -> datetime | None:
+        """An ISO 8601 date field (naive values are taken as UTC)"""
+        value = entry.get(field)
+        if not value:
+            return None
+        if not isinstance(value, str):
+            raise ValueError(f"Invalid date format for {field}")
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"Invalid date format for {field}")
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
     @staticmethod
     def _validate_book_entry(entry: Dict, row_num: int) -> Dict:
         """Validate and normalize a book entry"""
 
-        if not entry.get("title"):
+        title = entry.get("title")
+        if title is not None and not isinstance(title, str):
+            raise ValueError("Invalid value for title")
+        if not title or not title.strip():
             raise ValueError("Missing required field: title")
 
-        reading_started = entry.get("reading_started")
-        reading_finished = entry.get("reading_finished")
+        reading_started = JSONHandler._optional_date(entry, "reading_started") or datetime.now(timezone.utc)
+        reading_finished = JSONHandler._optional_date(entry, "reading_finished")
 
-        if reading_started:
-            try:
-                if isinstance(reading_started, str):
-                    reading_started = datetime.fromisoformat(reading_started.replace('Z', '+00:00'))
-            except (ValueError, TypeError):
-                raise ValueError("Invalid date format for reading_started")
-        else:
-            reading_started = datetime.now(timezone.utc)
-
-        if reading_finished:
-            try:
-                if isinstance(reading_finished, str):
-                    reading_finished = datetime.fromisoformat(reading_finished.replace('Z', '+00:00'))
-            except (ValueError, TypeError):
-                raise ValueError("Invalid date format for reading_finished")
-
-        if reading_finished and reading_started and reading_finished < reading_started:
+        if reading_finished and reading_finished < reading_started:
             raise ValueError("Finish date cannot be before start date")
 
         rating = entry.get("rating", 0.0)
@@ -169,58 +298,84 @@ class JSONHandler(FileHandler):
 
         valid_formats = ['paperback', 'hardcover', 'ebook', 'audiobook']
         book_format = entry.get("format")
-        if book_format and book_format.lower() not in valid_formats:
+        book_format = book_format.strip().lower() if isinstance(book_format, str) else None
+        if book_format not in valid_formats:
             book_format = None
 
         return {
-            "title": entry["title"].strip(),
-            "author": entry.get("author", "").strip() if entry.get("author") else None,
-            "isbn": entry.get("isbn", "").strip() if entry.get("isbn") else None,
-            "genre": entry.get("genre", "").strip() if entry.get("genre") else None,
+            "title": title.strip(),
+            "author": JSONHandler._optional_str(entry, "author"),
+            "isbn": JSONHandler._optional_str(entry, "isbn"),
+            "genre": JSONHandler._optional_str(entry, "genre"),
             "rating": rating,
-            "description": entry.get("description", "").strip() if entry.get("description") else None,
-            "cover_image": entry.get("cover_image", "").strip() if entry.get("cover_image") else None,
+            "description": JSONHandler._optional_str(entry, "description"),
+            "cover_image": JSONHandler._optional_str(entry, "cover_image"),
             "reading_started": reading_started,
             "reading_finished": reading_finished,
             "is_favorite": bool(entry.get("is_favorite", False)),
             "page_count": page_count,
-            "publisher": entry.get("publisher", "").strip() if entry.get("publisher") else None,
+            "publisher": JSONHandler._optional_str(entry, "publisher"),
             "publication_year": publication_year,
-            "language": entry.get("language", "English").strip(),
-            "format": book_format.lower() if book_format else None
+            "language": JSONHandler._optional_str(entry, "language") or "English",
+            "format": book_format
+        }
+
+    @staticmethod
+    def _export_record(book: Dict) -> Dict:
+        """Build the JSON export record for one serialized book"""
+        return {
+            "id": book.get("id"),
+            "title": book.get("title"),
+            "author": book.get("author"),
+            "isbn": book.get("isbn"),
+            "genre": book.get("genre"),
+            "rating": book.get("rating", 0.0),
+            "description": book.get("description"),
+            "cover_image": book.get("cover_image"),
+            "reading_started": book.get("reading_started").isoformat() if book.get("reading_started") else None,
+            "reading_finished": book.get("reading_finished").isoformat() if book.get("reading_finished") else None,
+            "is_favorite": book.get("is_favorite", False),
+            "page_count": book.get("page_count"),
+            "publisher": book.get("publisher"),
+            "publication_year": book.get("publication_year"),
+            "language": book.get("language", "English"),
+            "format": book.get("format"),
+            "created_at": book.get("created_at").isoformat() if book.get("created_at") else None,
+            "updated_at": book.get("updated_at").isoformat() if book.get("updated_at") else None
         }
 
     @staticmethod
     def generate_export(books: List[Dict]) -> str:
         """Generate JSON export string"""
 
-        export_data = []
-
-        for book in books:
-            export_book = {
-                "id": book.get("id"),
-                "title": book.get("title"),
-                "author": book.get("author"),
-                "isbn": book.get("isbn"),
-                "genre": book.get("genre"),
-                "rating": book.get("rating", 0.0),
-                "description": book.get("description"),
-                "cover_image": book.get("cover_image"),
-                "reading_started": book.get("reading_started").isoformat() if book.get("reading_started") else None,
-                "reading_finished": book.get("reading_finished").isoformat() if book.get("reading_finished") else None,
-                "is_favorite": book.get("is_favorite", False),
-                "page_count": book.get("page_count"),
-                "publisher": book.get("publisher"),
-                "publication_year": book.get("publication_year"),
-                "language": book.get("language", "English"),
-                "format": book.get("format"),
-                "created_at": book.get("created_at").isoformat() if book.get("created_at") else None,
-                "updated_at": book.get("updated_at").isoformat() if book.get("updated_at") else None
-            }
-            export_data.append(export_book)
+        export_data = [JSONHandler._export_record(book) for book in books]
 
         return json.dumps(export_data, indent=2, ensure_ascii=False)
 
+    @staticmethod
+    async def stream_export(books: AsyncIterable[Dict], batch_size: int = 500) -> AsyncIterator[bytes]:
+        """
+        Stream a JSON array export as books arrive, one chunk per batch_size books.
+        Output is byte-identical to generate_export.
+        """
+        yield b"["
+
+        chunk = []
+        empty = True
+        async for book in books:
+            record = json.dumps(JSONHandler._export_record(book), indent=2, ensure_ascii=False)
+            chunk.append(("\n" if empty else ",\n") + textwrap.indent(record, "  "))
+            empty = False
+
+            if len(chunk) >= batch_size:
+                yield "".join(chunk).encode("utf-8")
+                chunk = []
+
+        if chunk:
+            yield "".join(chunk).encode("utf-8")
+
+        yield b"]" if empty else b"\n]"
+
 
 class CSVHandler(FileHandler):
     """Handle CSV file operations"""
@@ -232,72 +387,55 @@ class CSVHandler(FileHandler):
     ]
 
     @staticmethod
-    async def parse_import(file: UploadFile, user_id=None, db=None) -> Tuple[List[Dict], List[Dict]]:
+    async def parse_import_batches(
+        file: UploadFile, batch_size: int = 500
+    ) -> AsyncIterator[Tuple[List[Dict], List[Dict], List[int]]]:
         """
-        Parse CSV file for import
-        Returns: (valid_books, errors)
+        Stream-parse CSV file for import, decoding incrementally from the upload spool
+        Yields: (valid_books, errors, row numbers of valid_books) for every batch_size rows
+        Duplicates are detected at insert time by the (user_id, dedup_key) unique index.
         """
-        await CSVHandler.validate_file_size(file)
+        await file.seek(0)
+        stream = CSVHandler.open_text_stream(file, encoding="utf-8-sig")  # Handle BOM
 
         try:
-            contents = await file.read()
-            decoded_content = contents.decode('utf-8-sig')  # Handle BOM
-
-            csv_reader = csv.DictReader(StringIO(decoded_content))
+            csv_reader = csv.DictReader(stream)
+            fieldnames = await run_in_threadpool(lambda: csv_reader.fieldnames)
 
-            if not csv_reader.fieldnames:
+            if not fieldnames:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="CSV file is empty or has no headers"
                 )
 
-            # Build existing books set for deduplication
-            existing_keys = set()
-            if db is not None and user_id is not None:
-                existing_cursor = db.books.find(
-                    {"user_id": user_id},
-                    {"title": 1, "author": 1, "language": 1}
-                )
-                async for book in existing_cursor:
-                    key = (
-                        (book.get("title") or "").strip().lower(),
-                        (book.get("author") or "").strip().lower(),
-                        (book.get("language") or "english").strip().lower()
-                    )
-                    existing_keys.add(key)
-
-            valid_books = []
-            errors = []
-
-            for idx, row in enumerate(csv_reader, start=2):
-                try:
-                    book = CSVHandler._validate_csv_row(row, idx)
+            idx = 1
+
+            while True:
+                rows = await run_in_threadpool(lambda: list(islice(csv_reader, batch_size)))
+                if not rows:
+                    break
+
+                valid_books = []
+                valid_rows = []
+                errors = []
+
+                for row in rows:
+                    idx += 1
+                    try:
+                        book = CSVHandler._validate_csv_row(row, idx)
+                        book.update(book_derived_fields(book))
 
-                    dup_key = (
-                        (book.get("title") or "").strip().lower(),
-                        (book.get("author") or "").strip().lower(),
-                        (book.get("language") or "english").strip().lower()
-                    )
+                        valid_books.append(book)
+                        valid_rows.append(idx)
 
-                    if dup_key in existing_keys:
+                    except ValueError as e:
                         errors.append({
                             "row": idx,
-                            "error": "Duplicate entry skipped (same title, author, and book language already exists)",
+                            "error": str(e),
                             "data": {"title": row.get("title", "Unknown"), "author": row.get("author", "Unknown"), "language": row.get("language", "English")}
                         })
-                        continue
-
-                    existing_keys.add(dup_key)
-                    valid_books.append(book)
-
-                except ValueError as e:
-                    errors.append({
-                        "row": idx,
-                        "error": str(e),
-                        "data": {"title": row.get("title", "Unknown"), "author": row.get("author", "Unknown"), "language": row.get("language", "English")}
-                    })
 
-            return valid_books, errors
+                yield valid_books, errors, valid_rows
 
         except UnicodeDecodeError:
             raise HTTPException(
@@ -314,6 +452,9 @@ class CSVHandler(FileHandler):
     def _validate_csv_row(row: Dict, row_num: int) -> Dict:
         """Validate and normalize a CSV row"""
 
+        # Short rows fill missing columns with None, long rows collect extras under None
+        row = {key: value if isinstance(value, str) else "" for key, value in row.items() if key is not None}
+
         title = row.get("title", "").strip()
         if not title:
             raise ValueError("Missing required field: title")
@@ -345,6 +486,12 @@ class CSVHandler(FileHandler):
         else:
             reading_finished = None
 
+        # Naive timestamps are UTC, like the date-only forms
+        if reading_started.tzinfo is None:
+            reading_started = reading_started.replace(tzinfo=timezone.utc)
+        if reading_finished and reading_finished.tzinfo is None:
+            reading_finished = reading_finished.replace(tzinfo=timezone.utc)
+
         if reading_finished and reading_finished < reading_started:
             raise ValueError("Finish date cannot be before start date")
 
@@ -408,6 +555,34 @@ class CSVHandler(FileHandler):
             "format": book_format or None
         }
 
+    @staticmethod
+    def _export_row(book: Dict) -> Dict:
+        """Build the CSV export row for one serialized book"""
+        reading_started = book.get("reading_started")
+        reading_finished = book.get("reading_finished")
+        created_at = book.get("created_at")
+        updated_at = book.get("updated_at")
+
+        return {
+            "title": book.get("title", ""),
+            "author": book.get("author", "") or "",
+            "isbn": book.get("isbn", "") or "",
+            "genre": book.get("genre", "") or "",
+            "rating": book.get("rating", 0.0),
+            "description": book.get("description", "") or "",
+            "cover_image": book.get("cover_image", "") or "",
+            "reading_started": reading_started.isoformat() if reading_started else "",
+            "reading_finished": reading_finished.isoformat() if reading_finished else "",
+            "is_favorite": str(book.get("is_favorite", False)).lower(),
+            "page_count": book.get("page_count", "") if book.get("page_count") is not None else "",
+            "publisher": book.get("publisher", "") or "",
+            "publication_year": book.get("publication_year", "") if book.get("publication_year") is not None else "",
+            "language": book.get("language", "English") or "English",
+            "format": book.get("format", "") or "",
+            "created_at": created_at.isoformat() if created_at else "",
+            "updated_at": updated_at.isoformat() if updated_at else "",
+        }
+
     @staticmethod
     def generate_export(books: List[Dict]) -> str:
         """Generate CSV export string"""
@@ -418,31 +593,33 @@ class CSVHandler(FileHandler):
         writer.writeheader()
 
         for book in books:
-            reading_started = book.get("reading_started")
-            reading_finished = book.get("reading_finished")
-            created_at = book.get("created_at")
-            updated_at = book.get("updated_at")
-
-            row = {
-                "title": book.get("title", ""),
-                "author": book.get("author", "") or "",
-                "isbn": book.get("isbn", "") or "",
-                "genre": book.get("genre", "") or "",
-                "rating": book.get("rating", 0.0),
-                "description": book.get("description", "") or "",
-                "cover_image": book.get("cover_image", "") or "",
-                "reading_started": reading_started.isoformat() if reading_started else "",
-                "reading_finished": reading_finished.isoformat() if reading_finished else "",
-                "is_favorite": str(book.get("is_favorite", False)).lower(),
-                "page_count": book.get("page_count", "") if book.get("page_count") is not None else "",
-                "publisher": book.get("publisher", "") or "",
-                "publication_year": book.get("publication_year", "") if book.get("publication_year") is not None else "",
-                "language": book.get("language", "English") or "English",
-                "format": book.get("format", "") or "",
-                "created_at": created_at.isoformat() if created_at else "",
-                "updated_at": updated_at.isoformat() if updated_at else "",
-            }
-            writer.writerow(row)
+            writer.writerow(CSVHandler._export_row(book))
 
         return output.getvalue()
-    
\ No newline at end of file
+
+    @staticmethod
+    async def stream_export(books: AsyncIterable[Dict], batch_size: int = 500) -> AsyncIterator[bytes]:
+        """
+        Stream a CSV export (UTF-8 with BOM for Excel) as books arrive,
+        one chunk per batch_size rows. Only the current batch is held in memory.
+        """
+        output = StringIO()
+        writer = csv.DictWriter(output, fieldnames=CSVHandler.CSV_HEADERS)
+
+        writer.writeheader()
+        yield output.getvalue().encode("utf-8-sig")
+        output.seek(0)
+        output.truncate(0)
+
+        rows = 0
+        async for book in books:
+            writer.writerow(CSVHandler._export_row(book))
+            rows += 1
+
+            if rows % batch_size == 0:
+                yield output.getvalue().encode("utf-8")
+                output.seek(0)
+                output.truncate(0)
+
+        if output.tell():
+            yield output.getvalue().encode("utf-8")
@@ -0,0 +1,252 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Tuple
+
+from bson import ObjectId, json_util
+from fastapi import HTTPException, status
+
+
+SortSpec = List[Tuple[str, int]]
+
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+# Types a sort key value may have inside a cursor
+CURSOR_SCALARS = (str, int, float, datetime, ObjectId, type(None))
+
+
+def with_tiebreaker(sort_by: SortSpec) -> SortSpec:
+    """Append _id to a sort spec so every document has a unique position"""
+    if any(field == "_id" for field, _ in sort_by):
+        return list(sort_by)
+
+    direction = sort_by[-1][1] if sort_by else 1
+    return list(sort_by) + [("_id", direction)]
+
+
+def encode_cursor(doc: dict, sort_by: SortSpec, sort_key: str, direction: str) -> str:
+    """
+    Build an opaque cursor pointing at a document.
+    The cursor carries the sort key values plus _id of the document.
+    """
+    payload = {
+        "s": sort_key,
+        "d": direction,
+        "v": [doc.get(field) for field, _ in sort_by],
+    }
+    raw = json_util.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: SortSpec, sort_key: str) -> Tuple[list, str]:
+    """
+    Decode a cursor produced by encode_cursor
+    Returns: (values, direction)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["v"]
+        direction = payload["d"]
+        cursor_sort = payload["s"]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    if cursor_sort != sort_key:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match the requested sort order"
+        )
+
+    if direction not in (CURSOR_NEXT, CURSOR_PREV) or len(values) != len(sort_by):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    # Values go straight into query filters - anything but a scalar could smuggle in operators
+    if not isinstance(values[-1], ObjectId) or not all(isinstance(value, CURSOR_SCALARS) for value in values):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    return values, direction
+
+
+def reverse_sort(sort_by: SortSpec) -> SortSpec:
+    """Flip the direction of every key in a sort spec"""
+    return [(field, -direction) for field, direction in sort_by]
+
+
+def _after_conditions(field: str, direction: int, value: Any) -> List[dict]:
+    """
+    Conditions matching values that sort strictly after `value`.
+    MongoDB sorts null/missing first ascending and last descending,
+    and range operators never match null, so nulls are handled explicitly.
+    """
+    if direction == 1:
+        if value is None:
+            return [{field: {"$ne": None}}]
+        return [{field: {"$gt": value}}]
+
+    if value is None:
+        return []
+    return [{field: {"$lt": value}}, {field: None}]
+
+
+def keyset_filter(sort_by: SortSpec, values: list) -> dict:
+    """
+    Build the filter selecting documents positioned after `values`
+    in `sort_by` order (lexicographic over all sort keys)
+    """
+    clauses = []
+    prefix = {}
+
+    for (field, direction), value in zip(sort_by, values):
+        for condition in _after_conditions(field, direction, value):
+            clauses.append({**prefix, **condition})
+        prefix[field] = value
+
+    if not clauses:
+        # Nothing can sort after this position
+        return {"_id": {"$exists": False}}
+
+    return {"$or": clauses}
+
+
+def merge_filters(query: dict, extra: dict) -> dict:
+    """AND an extra filter into a query without clobbering its own $or"""
+    merged = dict(query)
+    merged["$and"] = list(query.get("$and", [])) + [extra]
+    return merged
+
+
+async def fetch_page(
+    collection,
+    query: dict,
+    sort_by: SortSpec,
+    sort_key: str,
+    limit: int,
+    page: int = 1,
+    cursor: str | None = None,
+) -> dict:
+    """
+    Fetch one page of documents, by keyset cursor when given, else by page number.
+    Cursor pages cost a single index seek regardless of depth.
+
+    Returns dict with: items, has_next, has_prev, next_cursor, prev_cursor
+    """
+    sort_by = with_tiebreaker(sort_by)
+
+    if cursor:
+        values, direction = decode_cursor(cursor, sort_by, sort_key)
+
+        if direction == CURSOR_PREV:
+            scan_sort = reverse_sort(sort_by)
+        else:
+            scan_sort = sort_by
+
+        page_query = merge_filters(query, keyset_filter(scan_sort, values))
+        docs = await collection.find(page_query).sort(scan_sort).limit(limit + 1).to_list(length=limit + 1)
+
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+
+        if direction == CURSOR_PREV:
+            docs.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, True
+    else:
+        skip = (page - 1) * limit
+        docs = await collection.find(query).sort(sort_by).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+
+        has_next = len(docs) > limit
+        has_prev = page > 1
+        docs = docs[:limit]
+
+    next_cursor = None
+    prev_cursor = None
+    if docs:
+        if has_next:
+            next_cursor = encode_cursor(docs[-1], sort_by, sort_key, CURSOR_NEXT)
+        if has_prev:
+            prev_cursor = encode_cursor(docs[0], sort_by, sort_key, CURSOR_PREV)
+
+    return {
+        "items": docs,
+        "has_next": has_next,
+        "has_prev": has_prev,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }
+
+
+NEIGHBOR_FIELD = "_neighbor"
+
+
+async def fetch_neighbors(
+    collection,
+    query: dict,
+    sort_by: SortSpec,
+    doc: dict,
+    window: int = 1,
+    wrap: bool = False,
+) -> dict:
+    """
+    Fetch the documents just before and after `doc` in `sort_by` order among those
+    matching `query`, in a single aggregation. Each $unionWith branch is its own
+    keyset seek, so the same indexes as paginated listing serve it.
+    With wrap, the first/last documents fill in when doc sits at either end.
+
+    Returns dict with: prev, next (lists of up to `window` documents, nearest first)
+    """
+    sort_by = with_tiebreaker(sort_by)
+    backwards = reverse_sort(sort_by)
+    values = [doc.get(field) for field, _ in sort_by]
+
+    def branch(name: str, match: dict, order: SortSpec) -> list:
+        return [
+            {"$match": match},
+            {"$sort": dict(order)},
+            {"$limit": window},
+            {"$set": {NEIGHBOR_FIELD: name}},
+        ]
+
+    branches = [
+        branch("next", merge_filters(query, keyset_filter(sort_by, values)), sort_by),
+        branch("prev", merge_filters(query, keyset_filter(backwards, values)), backwards),
+    ]
+    if wrap:
+        branches.append(branch("first", query, sort_by))
+        branches.append(branch("last", query, backwards))
+
+    pipeline = branches[0] + [
+        {"$unionWith": {"coll": collection.name, "pipeline": extra}} for extra in branches[1:]
+    ]
+
+    found = {"next": [], "prev": [], "first": [], "last": []}
+    async for item in collection.aggregate(pipeline):
+        found[item.pop(NEIGHBOR_FIELD)].append(item)
+
+    def fill(nearest: list, wrapped: list) -> list:
+        # Continue past the end from the other side, never repeating a document
+        seen = {doc["_id"]} | {item["_id"] for item in nearest}
+        result = list(nearest)
+        for item in wrapped:
+            if len(result) >= window:
+                break
+            if item["_id"] not in seen:
+                seen.add(item["_id"])
+                result.append(item)
+        return result
+
+    return {
+        "next": fill(found["next"], found["first"]),
+        "prev": fill(found["prev"], found["last"]),
+    }
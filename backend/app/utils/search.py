@@ -0,0 +1,81 @@
+"""
+Token-based search over title and author.
+
+Documents store their normalized words in a `terms` array backed by a
+(user_id, terms) multikey index. Queries match every search word as an
+anchored prefix of some term, so each word becomes an index range scan
+instead of an unanchored regex over every document the user owns.
+"""
+from typing import Dict, Iterable, List
+import re
+import sys
+import unicodedata
+
+
+# Fields whose words are indexed
+SEARCH_SOURCE_FIELDS = ("title", "author")
+
+MAX_TERMS = 64          # Per document - bounds multikey index entries
+MAX_QUERY_TERMS = 8     # Per search - extra words are ignored
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str | None) -> List[str]:
+    """Split text into case-folded, accent-stripped words (unique, in order)"""
+    if not text:
+        return []
+
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+
+    return list(dict.fromkeys(_WORD_RE.findall(stripped)))
+
+
+def search_terms(values: Iterable[str | None]) -> List[str]:
+    """Indexed terms for a document's searchable values"""
+    terms = []
+    for value in values:
+        terms.extend(tokenize(value))
+    return list(dict.fromkeys(terms))[:MAX_TERMS]
+
+
+def search_fields(doc: Dict) -> Dict:
+    """The `terms` field for a (complete) book or wishlist document"""
+    return {"terms": search_terms(doc.get(field) for field in SEARCH_SOURCE_FIELDS)}
+
+
+def search_filter(text: str) -> Dict | None:
+    """
+    Query condition matching documents where every word of `text` prefixes a term.
+    User input is tokenized and escaped, so it can never form a pattern.
+    Returns None when the text contains no searchable words.
+    """
+    words = tokenize(text)[:MAX_QUERY_TERMS]
+    if not words:
+        return None
+
+    # Longest word first - it's the most selective range for the index to scan
+    words.sort(key=len, reverse=True)
+    return {"$all": [re.compile("^" + re.escape(word)) for word in words]}
+
+
+def prefix_range(prefix: str) -> Dict:
+    """
+    Range condition matching strings that start with `prefix` - a plain index
+    range scan, with no pattern to build or escape. Strings compare by code
+    point, so the upper bound is the prefix with its last character incremented.
+    """
+    last = ord(prefix[-1])
+    if last >= sys.maxunicode:
+        return {"$gte": prefix}
+    return {"$gte": prefix, "$lt": prefix[:-1] + chr(last + 1)}
+
+
+def contains_filter(folded: str) -> Dict:
+    """
+    Condition matching strings that contain `folded` anywhere (for *_lc fields).
+    Escaped, so user input never forms a pattern; on an indexed field the
+    pattern is checked against index keys rather than fetched documents.
+    """
+    return {"$regex": re.escape(folded)}
@@ -0,0 +1,49 @@
+"""
+The one place MongoDB documents become API payloads.
+Output already matches the response schemas (ids as str, numbers coerced),
+so hot list endpoints can hand it straight to ORJSONResponse without
+re-validating every item through the response_model.
+"""
+from typing import Dict
+
+
+def serialize_book(book: Dict) -> Dict:
+    """Convert MongoDB document to BookResponse format (also the export record format)"""
+    return {
+        "id": str(book["_id"]),
+        "title": book["title"],
+        "author": book.get("author"),
+        "isbn": book.get("isbn"),
+        "genre": book.get("genre"),
+        "rating": float(book.get("rating") or 0.0),
+        "description": book.get("description"),
+        "cover_image": book.get("cover_image"),
+        "reading_started": book["reading_started"],
+        "reading_finished": book.get("reading_finished"),
+        "is_favorite": bool(book.get("is_favorite", False)),
+        "page_count": book.get("page_count"),
+        "publisher": book.get("publisher"),
+        "publication_year": book.get("publication_year"),
+        "language": book.get("language") or "English",
+        "format": book.get("format"),
+        "created_at": book["created_at"],
+        "updated_at": book["updated_at"],
+    }
+
+
+def serialize_wishlist(item: Dict) -> Dict:
+    """Convert MongoDB document to WishlistResponse format"""
+    price = item.get("price")
+    return {
+        "id": str(item["_id"]),
+        "title": item["title"],
+        "author": item.get("author"),
+        "isbn": item.get("isbn"),
+        "genre": item.get("genre"),
+        "priority": item.get("priority", 1),
+        "notes": item.get("notes"),
+        "price": str(price) if price is not None else None,    # Decimal as JSON string, like pydantic
+        "where_to_buy": item.get("where_to_buy"),
+        "created_at": item["created_at"],
+        "updated_at": item["updated_at"],
+    }
@@ -1,14 +1,21 @@
-from fastapi import FastAPI, Request, status
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from contextlib import asynccontextmanager
 import logging
 
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
 from app.core.database import db
-from app.api.routes import auth, books, data, users, wishlist
+from app.core.dependencies import require_internal_token, user_cache
+from app.core.events import event_hub
+from app.core.facets import facet_cache
+from app.core.import_jobs import start_import_workers, stop_import_workers
+from app.core.security import password_hash_stats, shutdown_hash_pool
+from app.core.storage import close_storage
+from app.api.routes import auth, books, data, events, users, wishlist
 
 
 # Configure logging
@@ -25,13 +32,20 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting My Reading Journey API...")
     await db.connect()
+    await start_import_workers()
+    if settings.LIVE_EVENTS_ENABLED:
+        event_hub.start()
     logger.info("✅ Application startup complete")
     
     yield
     
     # Shutdown
     logger.info("🔄 Shutting down...")
+    await stop_import_workers()
+    await event_hub.stop()
     await db.close()
+    shutdown_hash_pool()
+    close_storage()
     logger.info("👋 Shutdown complete")
 
 
@@ -41,6 +55,7 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="Track, rate, and organize your reading journey",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
     root_path="/api/v1"
@@ -54,7 +69,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition"]       # Necessary for file downloads
+    expose_headers=["Content-Disposition", "ETag"]       # File downloads, conditional GETs
+)
+
+
+# Response compression - list pages and exports are large, repetitive JSON/CSV
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    level=settings.COMPRESSION_LEVEL,
+    route_levels={
+        "/data/export": settings.COMPRESSION_EXPORT_LEVEL,
+    }
 )
 
 
@@ -85,7 +111,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """Handle HTTP exceptions"""
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -141,6 +168,7 @@ async def general_exception_handler(request: Request, exc: Exception):
 app.include_router(auth.router, prefix="/auth")
 app.include_router(books.router, prefix="/books")
 app.include_router(data.router, prefix="/data")
+app.include_router(events.router, prefix="/events")
 app.include_router(users.router, prefix="/users")
 app.include_router(wishlist.router, prefix="/wishlist")
 
@@ -148,11 +176,25 @@ app.include_router(wishlist.router, prefix="/wishlist")
 # Health check endpoint
 @app.get("/health", tags=["Health"])
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness only - no internal metrics)"""
     return {
         "status": "healthy",
         "version": settings.APP_VERSION,
-        "app": settings.APP_NAME
+        "app": settings.APP_NAME,
+    }
+
+
+# Operational metrics - internal only, behind INTERNAL_STATS_TOKEN
+@app.get("/internal/stats", include_in_schema=False, dependencies=[Depends(require_internal_token)])
+async def internal_stats():
+    """Cache, live-event and password-hashing metrics for this worker process"""
+    return {
+        "cache": {
+            "users": user_cache.stats(),
+            "facets": facet_cache.stats()
+        },
+        "live_events": event_hub.stats(),
+        "password_hashing": password_hash_stats()
     }
 
 
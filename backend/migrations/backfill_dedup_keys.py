@@ -0,0 +1,57 @@
+"""
+Backfill the normalized dedup_key on books created before it existed.
+
+Usage (from the backend directory):
+    python -m migrations.backfill_dedup_keys
+
+Books are processed oldest first, so the original copy of a pre-existing
+duplicate keeps the plain key; later copies get an _id-suffixed key that
+keeps the (user_id, dedup_key) unique index satisfied.
+"""
+import os
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+from dotenv import load_dotenv
+
+from app.utils.book_fields import dedup_key
+
+
+load_dotenv()
+
+
+async def backfill_dedup_keys():
+    """Set dedup_key on every book that is missing it"""
+
+    # Connect to MongoDB
+    client = AsyncIOMotorClient(os.getenv('MONGODB_URI'))
+    db = client[os.getenv('MONGODB_DBNAME', 'myreadingjourney')]
+
+    cursor = db.books.find(
+        {"dedup_key": {"$exists": False}},
+        {"title": 1, "author": 1, "language": 1}
+    ).sort([("created_at", 1), ("_id", 1)])
+
+    updated = 0
+    suffixed = 0
+    async for book in cursor:
+        key = dedup_key(book.get("title"), book.get("author"), book.get("language"))
+
+        try:
+            await db.books.update_one({"_id": book["_id"]}, {"$set": {"dedup_key": key}})
+        except DuplicateKeyError:
+            # Pre-existing duplicate - keep it, but give it a unique key
+            await db.books.update_one(
+                {"_id": book["_id"]},
+                {"$set": {"dedup_key": f"{key}\x1f#{book['_id']}"}}
+            )
+            suffixed += 1
+
+        updated += 1
+
+    print(f"Backfilled {updated} books ({suffixed} pre-existing duplicates kept with suffixed keys).")
+
+    client.close()
+
+if __name__ == '__main__':
+    asyncio.run(backfill_dedup_keys())
@@ -0,0 +1,75 @@
+"""
+Backfill the derived search/sort fields (terms and the case-folded *_lc fields)
+on books and wishlist items created before they existed.
+
+Usage (from the backend directory):
+    python -m migrations.backfill_derived_fields [--all]
+
+By default only documents missing a field are updated; --all recomputes
+every document (e.g. after changing the tokenizer or folding rules).
+dedup_key is unique and has its own migration (backfill_dedup_keys).
+"""
+import os
+import sys
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+from app.utils.book_fields import FOLDED_FIELDS, folded_fields
+from app.utils.search import SEARCH_SOURCE_FIELDS, search_fields
+
+
+load_dotenv()
+
+BATCH_SIZE = 1000
+
+
+def derived_fields(doc: dict) -> dict:
+    """Non-unique derived fields shared by books and wishlist items"""
+    return {**search_fields(doc), **folded_fields(doc)}
+
+
+async def backfill_collection(collection, recompute_all: bool) -> int:
+    """Set the derived fields on one collection in bulk batches"""
+    if recompute_all:
+        query = {}
+    else:
+        query = {"$or": [
+            {field: {"$exists": False}} for field in ["terms", *FOLDED_FIELDS.values()]
+        ]}
+    projection = {field: 1 for field in {*SEARCH_SOURCE_FIELDS, *FOLDED_FIELDS}}
+
+    updated = 0
+    operations = []
+    async for doc in collection.find(query, projection):
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": derived_fields(doc)}))
+
+        if len(operations) >= BATCH_SIZE:
+            await collection.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    return updated
+
+
+async def backfill_derived_fields(recompute_all: bool = False):
+    """Set the derived fields on every book and wishlist item"""
+
+    # Connect to MongoDB
+    client = AsyncIOMotorClient(os.getenv('MONGODB_URI'))
+    db = client[os.getenv('MONGODB_DBNAME', 'myreadingjourney')]
+
+    books = await backfill_collection(db.books, recompute_all)
+    wishlist = await backfill_collection(db.wishlist, recompute_all)
+
+    print(f"Backfilled derived fields on {books} books and {wishlist} wishlist items.")
+
+    client.close()
+
+if __name__ == '__main__':
+    asyncio.run(backfill_derived_fields(recompute_all="--all" in sys.argv[1:]))
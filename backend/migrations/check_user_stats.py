@@ -0,0 +1,71 @@
+"""
+Offline consistency check for the materialized user_stats and user_counters
+collections.
+
+Usage (from the backend directory):
+    python -m migrations.check_user_stats            # report drift only
+    python -m migrations.check_user_stats --repair   # rebuild drifted documents
+"""
+import os
+import sys
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+from app.core.counters import check_counters, rebuild_counters  # noqa: E402
+from app.core.stats import check_user_stats, rebuild_user_stats  # noqa: E402
+
+
+def _report(user: dict, label: str, mismatches: dict):
+    print(f"Drift in {label} for user {user.get('email', user['_id'])}:")
+    for field, (stored, expected) in mismatches.items():
+        print(f"  {field}: stored={stored} expected={expected}")
+
+
+async def check_all_user_stats(repair: bool = False):
+    """Compare every user's stats and counters documents against a fresh count"""
+
+    # Connect to MongoDB
+    client = AsyncIOMotorClient(os.getenv('MONGODB_URI'))
+    db = client[os.getenv('MONGODB_DBNAME', 'myreadingjourney')]
+
+    checked = 0
+    drifted = 0
+    async for user in db.users.find({}, {"_id": 1, "email": 1}):
+        checked += 1
+        user_drifted = False
+
+        # Users who never opened their dashboard have no document yet
+        if await db.user_stats.find_one({"_id": user["_id"]}, {"_id": 1}):
+            mismatches = await check_user_stats(user["_id"], database=db)
+            if mismatches:
+                user_drifted = True
+                _report(user, "stats", mismatches)
+                if repair:
+                    await rebuild_user_stats(user["_id"], database=db)
+                    print("  -> rebuilt")
+
+        # Likewise for counters, seeded on the first list request
+        if await db.user_counters.find_one({"_id": user["_id"]}, {"_id": 1}):
+            mismatches = await check_counters(user["_id"], database=db)
+            if mismatches:
+                user_drifted = True
+                _report(user, "counters", mismatches)
+                if repair:
+                    await rebuild_counters(user["_id"], database=db)
+                    print("  -> rebuilt")
+
+        drifted += user_drifted
+
+    print(f"\nChecked {checked} users, {drifted} with drifted stats or counters.")
+
+    client.close()
+    return drifted
+
+
+if __name__ == '__main__':
+    drifted = asyncio.run(check_all_user_stats(repair='--repair' in sys.argv))
+    sys.exit(1 if drifted and '--repair' not in sys.argv else 0)
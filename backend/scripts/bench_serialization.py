@@ -0,0 +1,105 @@
+"""
+Microbenchmark: rendering a books list page through the default FastAPI path
+(response_model validation + jsonable_encoder + stdlib json) versus the fast
+path used by the list endpoints (shared serializer straight into orjson).
+
+Usage (from the backend directory):
+    python -m scripts.bench_serialization
+    python -m scripts.bench_serialization --items 100 --repeat 200
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import orjson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.schemas.book import BooksListResponse
+from app.utils.serializers import serialize_book
+
+
+def make_books(count: int) -> list[dict]:
+    """Realistic book documents, with full-length descriptions"""
+    started = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": ObjectId(),
+            "title": f"Book number {index}",
+            "author": f"Author {index % 37}",
+            "isbn": "9780743273565",
+            "genre": "Classic",
+            "rating": 4.5,
+            "description": "A long description. " * 100,
+            "cover_image": "https://res.cloudinary.com/demo/image/upload/v1/book_covers/cover.jpg",
+            "reading_started": started + timedelta(days=index),
+            "reading_finished": started + timedelta(days=index + 10),
+            "is_favorite": index % 5 == 0,
+            "page_count": 320,
+            "publisher": "Scribner",
+            "publication_year": 1925,
+            "language": "English",
+            "format": "paperback",
+            "created_at": started,
+            "updated_at": started,
+        }
+        for index in range(count)
+    ]
+
+
+def default_path(books: list[dict]) -> bytes:
+    """What FastAPI does for a dict returned under response_model with JSONResponse"""
+    payload = {
+        "books": [serialize_book(book) for book in books],
+        "total": len(books), "page": 1, "pages": 1, "has_next": False, "has_prev": False,
+    }
+    model = BooksListResponse.model_validate(payload)
+    content = jsonable_encoder(model)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(books: list[dict]) -> bytes:
+    """What the list endpoints do now: shared serializer into ORJSONResponse"""
+    payload = {
+        "books": [serialize_book(book) for book in books],
+        "total": len(books), "page": 1, "pages": 1, "has_next": False, "has_prev": False,
+        "next_cursor": None, "prev_cursor": None,
+    }
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def measure(func, books: list[dict], repeat: int) -> float:
+    """Median milliseconds per rendered page"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(books)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list page serialization")
+    parser.add_argument("--items", type=int, default=100, help="Books per page")
+    parser.add_argument("--repeat", type=int, default=200, help="Renders per path")
+    args = parser.parse_args()
+
+    books = make_books(args.items)
+
+    # Both paths must produce the same document
+    assert json.loads(default_path(books))["books"] == json.loads(fast_path(books))["books"]
+
+    default_ms = measure(default_path, books, args.repeat)
+    fast_ms = measure(fast_path, books, args.repeat)
+
+    print(f"{args.items} books per page, median of {args.repeat} renders")
+    print(f"  response_model + json : {default_ms:8.3f} ms")
+    print(f"  serializer + orjson   : {fast_ms:8.3f} ms")
+    print(f"  speedup               : {default_ms / fast_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Pick a bcrypt cost factor for a target hashing latency on this host.
+
+Usage (from the backend directory):
+    python -m scripts.calibrate_bcrypt                  # target 250ms
+    python -m scripts.calibrate_bcrypt --target-ms 100 --samples 5
+
+Set the suggested value as BCRYPT_ROUNDS in .env. Existing hashes keep
+working at their original cost; new hashes use the new one.
+"""
+import argparse
+import statistics
+import time
+
+import bcrypt
+
+
+MIN_ROUNDS = 10     # OWASP floor - never suggest anything weaker
+MAX_ROUNDS = 16
+
+
+def measure_rounds(rounds: int, samples: int) -> float:
+    """Median milliseconds to hash one password at the given cost"""
+    password = b"Calibration-Passw0rd"
+    timings = []
+
+    for _ in range(samples):
+        salt = bcrypt.gensalt(rounds=rounds)
+        started = time.perf_counter()
+        bcrypt.hashpw(password, salt)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, samples: int) -> int:
+    """Highest cost whose median latency stays within target_ms"""
+    chosen = MIN_ROUNDS
+
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure_rounds(rounds, samples)
+        print(f"  rounds={rounds:>2}  median={elapsed:8.1f}ms")
+
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+
+    return chosen
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Target hash latency in milliseconds")
+    parser.add_argument("--samples", type=int, default=3, help="Hashes measured per cost factor")
+    args = parser.parse_args()
+
+    print(f"Calibrating bcrypt for a {args.target_ms:.0f}ms target...")
+    rounds = calibrate(args.target_ms, args.samples)
+    print(f"\nSuggested setting: BCRYPT_ROUNDS={rounds}")
@@ -0,0 +1,116 @@
+from bson import ObjectId
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+import pytest
+
+from app.core import changes
+from app.core.changes import BOOK, fetch_changes
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    """The subset of MongoDB query semantics fetch_changes uses"""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = doc.get(key)
+            for operator, operand in condition.items():
+                if operator == "$gte" and not value >= operand:
+                    return False
+                if operator == "$gt" and not value > operand:
+                    return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs: list):
+        self._docs = docs
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self._docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count: int):
+        self._docs = self._docs[:count]
+        return self
+
+    async def to_list(self, length: int):
+        return self._docs[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._docs:
+            yield doc
+
+
+class FakeCollection:
+    def __init__(self, docs: list | None = None):
+        self.docs = docs or []
+
+    def find(self, query: dict, projection: dict | None = None):
+        return FakeCursor([dict(doc) for doc in self.docs if _matches(doc, query)])
+
+
+@pytest.fixture
+def tombstones(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(changes, "db", SimpleNamespace(tombstones=collection))
+    return collection
+
+
+def _books(user_id: ObjectId, count: int) -> list:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {"_id": ObjectId(), "user_id": user_id, "updated_at": start + timedelta(seconds=index // 3)}
+        for index in range(count)
+    ]
+
+
+def _serialize(doc: dict) -> dict:
+    return {"id": str(doc["_id"])}
+
+
+@pytest.mark.asyncio
+async def test_full_sync_pages_through_more_than_limit(tombstones):
+    user_id = ObjectId()
+    books = FakeCollection(_books(user_id, 23) + _books(ObjectId(), 5))
+
+    seen = []
+    since = None
+    for _ in range(10):
+        page = await fetch_changes(books, BOOK, user_id, since, 5, _serialize)
+        seen.extend(item["id"] for item in page["upserts"])
+        since = page["next_token"]
+        if not page["has_more"]:
+            break
+    else:
+        pytest.fail("Full sync never finished")
+
+    assert sorted(seen) == sorted(str(doc["_id"]) for doc in books.docs if doc["user_id"] == user_id)
+    assert len(seen) == len(set(seen))
+
+
+@pytest.mark.asyncio
+async def test_deletions_during_full_sync_reported_and_expired_ones_skipped(tombstones):
+    user_id = ObjectId()
+    books = FakeCollection(_books(user_id, 8))
+    now = datetime.now(timezone.utc)
+
+    first = await fetch_changes(books, BOOK, user_id, None, 5, _serialize)
+    assert first["has_more"]
+
+    deleted = books.docs.pop(0)["_id"]
+    tombstones.docs = [
+        {"user_id": user_id, "kind": BOOK, "doc_id": deleted, "deleted_at": now},
+        {"user_id": user_id, "kind": BOOK, "doc_id": ObjectId(), "deleted_at": now - timedelta(days=365)},
+    ]
+
+    last = await fetch_changes(books, BOOK, user_id, first["next_token"], 5, _serialize)
+    assert not last["has_more"]
+    assert last["deletions"] == [str(deleted)]
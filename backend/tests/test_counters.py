@@ -0,0 +1,77 @@
+from bson import ObjectId
+from types import SimpleNamespace
+import pytest
+
+from app.core import counters
+from app.core.counters import get_counters, increment_counters
+
+
+class FakeCounters:
+    """The user_counters operations the counters module uses"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query: dict):
+        doc = self.docs.get(query["_id"])
+        return dict(doc) if doc else None
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            if upsert:
+                self.docs[query["_id"]] = {"_id": query["_id"], **update.get("$setOnInsert", {})}
+            return SimpleNamespace(modified_count=0)
+
+        if any(doc.get(field) != value for field, value in query.items()):
+            return SimpleNamespace(modified_count=0)
+        for field, delta in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + delta
+        return SimpleNamespace(modified_count=1)
+
+
+@pytest.fixture
+def library(monkeypatch):
+    """A user library whose counts the test controls"""
+    state = {"books_total": 3, "books_favorite": 1, "wishlist_total": 0}
+    collection = FakeCounters()
+
+    async def count_from_source(user_id, database=None):
+        return dict(state)
+
+    monkeypatch.setattr(counters, "db", SimpleNamespace(user_counters=collection))
+    monkeypatch.setattr(counters, "_count_from_source", count_from_source)
+    return state, collection
+
+
+@pytest.mark.asyncio
+async def test_write_during_seed_is_not_lost(library):
+    state, collection = library
+    user_id = ObjectId()
+
+    seed_count = counters._count_from_source
+
+    async def count_then_write(user_id, database=None):
+        counts = await seed_count(user_id)
+        if not collection.docs:
+            # A book is added after the count, before the counter document exists
+            state["books_total"] += 1
+            await increment_counters(user_id, books_total=1)
+        return counts
+
+    counters._count_from_source = count_then_write
+
+    assert (await get_counters(user_id))["books_total"] == 4
+    assert collection.docs[user_id]["books_total"] == 4
+
+
+@pytest.mark.asyncio
+async def test_seed_keeps_increments_after_it(library):
+    state, collection = library
+    user_id = ObjectId()
+
+    assert await get_counters(user_id) == state
+
+    state["books_total"] += 1
+    await increment_counters(user_id, books_total=1)
+    assert (await get_counters(user_id))["books_total"] == 4
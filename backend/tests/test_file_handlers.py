@@ -0,0 +1,34 @@
+import io
+import json
+
+from fastapi import HTTPException
+import pytest
+
+from app.utils.file_handlers import JSONHandler
+
+
+def _entries(text: str, ndjson: bool = False) -> list:
+    return list(JSONHandler.iter_entries(io.StringIO(text), ndjson=ndjson))
+
+
+def test_array_of_books():
+    assert _entries('[{"title": "A"}, {"title": "B"}]') == [{"title": "A"}, {"title": "B"}]
+
+
+def test_newline_delimited_objects():
+    assert _entries('{"title": "A"}\n{"title": "B"}\n') == [{"title": "A"}, {"title": "B"}]
+
+
+def test_single_object_rejected_unless_ndjson():
+    export = json.dumps({"export_date": "2024-01-01", "user": {}, "books": [{"title": "A"}]})
+
+    with pytest.raises(HTTPException) as error:
+        _entries(export)
+    assert error.value.status_code == 400
+
+    assert _entries('{"title": "A"}', ndjson=True) == [{"title": "A"}]
+
+
+def test_objects_on_one_line_rejected():
+    with pytest.raises(json.JSONDecodeError):
+        _entries('{"title": "A"} {"title": "B"}')
@@ -0,0 +1,20 @@
+import re
+
+from app.utils.book_fields import fold
+from app.utils.search import contains_filter
+
+
+def _matches(condition: dict, value: str) -> bool:
+    return re.search(condition["$regex"], value) is not None
+
+
+def test_contains_filter_matches_anywhere_in_folded_value():
+    condition = contains_filter(fold(" Orwell "))
+    assert _matches(condition, fold("George Orwell"))
+    assert not _matches(condition, fold("Aldous Huxley"))
+
+
+def test_contains_filter_escapes_user_input():
+    condition = contains_filter(fold("Sci-Fi (Hard)."))
+    assert _matches(condition, fold("Sci-Fi (Hard)."))
+    assert not _matches(condition, fold("Sci-Fi XHardYZ"))
@@ -0,0 +1,111 @@
+from bson import ObjectId
+from collections import Counter
+from types import SimpleNamespace
+from pymongo.errors import DuplicateKeyError
+import pytest
+
+from app.core import stats
+from app.core.stats import STAT_FIELDS, get_user_stats, rebuild_user_stats, record_book_change
+
+
+class FakeStats:
+    """The user_stats operations the stats module uses (flat $inc keys only)"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query: dict, projection: dict | None = None):
+        doc = self.docs.get(query["_id"])
+        return dict(doc) if doc else None
+
+    async def insert_one(self, doc: dict):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate _id")
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def replace_one(self, query: dict, doc: dict):
+        stored = self.docs.get(query["_id"])
+        if stored is None or stored.get("version") != query["version"]:
+            return SimpleNamespace(matched_count=0)
+        self.docs[query["_id"]] = {"_id": query["_id"], **doc}
+        return SimpleNamespace(matched_count=1)
+
+    async def update_one(self, query: dict, update: dict):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            return
+        for field, delta in update["$inc"].items():
+            doc[field] = doc.get(field, 0) + delta
+        doc.update(update.get("$set", {}))
+
+
+@pytest.fixture
+def library(monkeypatch):
+    """Books the test controls, with stats computed from them"""
+    books = []
+    collection = FakeStats()
+
+    async def compute_user_stats(user_id, database=None):
+        totals = Counter()
+        for book in books:
+            totals.update(stats.book_contribution(book))
+        computed = {field: totals.get(field, 0) for field in STAT_FIELDS}
+        computed["genres"] = {}
+        computed["years"] = {}
+        return computed
+
+    database = SimpleNamespace(user_stats=collection)
+    monkeypatch.setattr(stats, "db", SimpleNamespace(user_stats=collection, db=database))
+    monkeypatch.setattr(stats, "compute_user_stats", compute_user_stats)
+    return books, collection
+
+
+async def _add_book(user_id: ObjectId, books: list):
+    book = {"_id": ObjectId(), "user_id": user_id, "page_count": 100}
+    books.append(book)
+    await record_book_change(user_id, None, book)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_does_not_overwrite_concurrent_increment(library, monkeypatch):
+    books, collection = library
+    user_id = ObjectId()
+    await _add_book(user_id, books)
+    await rebuild_user_stats(user_id)
+
+    compute = stats.compute_user_stats
+    raced = []
+
+    async def compute_then_write(user_id, database=None):
+        computed = await compute(user_id, database)
+        if not raced:
+            # A book is added after the stats were computed, before they are stored
+            raced.append(True)
+            await _add_book(user_id, books)
+        return computed
+
+    monkeypatch.setattr(stats, "compute_user_stats", compute_then_write)
+    await rebuild_user_stats(user_id)
+
+    assert collection.docs[user_id]["total_books"] == 2
+    assert collection.docs[user_id]["total_pages"] == 200
+
+
+@pytest.mark.asyncio
+async def test_write_during_first_build_is_not_lost(library, monkeypatch):
+    books, collection = library
+    user_id = ObjectId()
+    await _add_book(user_id, books)
+
+    compute = stats.compute_user_stats
+
+    async def compute_then_write(user_id, database=None):
+        computed = await compute(user_id, database)
+        if not collection.docs:
+            # Skipped increment: the stats document does not exist yet
+            await _add_book(user_id, books)
+        return computed
+
+    monkeypatch.setattr(stats, "compute_user_stats", compute_then_write)
+
+    assert (await get_user_stats(user_id))["total_books"] == 2